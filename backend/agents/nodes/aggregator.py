@@ -56,14 +56,14 @@ async def aggregator_node(state: AgentState, config: RunnableConfig = None) -> d
             "event_queue": [*base_event_queue],
         }
 
-    logger.info(f"[AGG] 正在聚合 {len(expert_results)} 个结果，调用 LLM 生成总结...")
+    logger.info("[AGG] 正在聚合 %s 个结果，调用 LLM 生成总结...", len(expert_results))
 
     # v3.5: 构建 Aggregator 的 Prompt（专家成果摘要）
     aggregator_input = _build_aggregator_input(expert_results, strategy)
 
     # v3.5: 三层兜底加载 System Prompt (L1: DB -> L2: Cache -> L3: Constants)
     system_prompt = _load_aggregator_system_prompt(aggregator_input)
-    logger.info(f"[AGG] System Prompt 长度: {len(system_prompt)} 字符")
+    logger.info("[AGG] System Prompt 长度: %s 字符", len(system_prompt))
 
     # v3.1: 获取 Aggregator LLM（带兜底逻辑）
     aggregator_llm = get_aggregator_llm()
@@ -85,7 +85,8 @@ async def aggregator_node(state: AgentState, config: RunnableConfig = None) -> d
             [SystemMessage(content=system_prompt), HumanMessage(content=aggregator_input)],
             config=aggregator_config,
         ):
-            content = chunk.content if hasattr(chunk, "content") else str(chunk)
+            # 聊天模型 astream 只产出 AIMessageChunk，直接读取 content（可能为空串）
+            content = chunk.content
             if content:
                 final_response_chunks.append(content)
                 # 🔥 移除：不再通过 event_queue 发送 message.delta
@@ -94,7 +95,7 @@ async def aggregator_node(state: AgentState, config: RunnableConfig = None) -> d
         final_response = "".join(final_response_chunks)
 
     except Exception as e:
-        logger.warning(f"[AGG] LLM 总结失败，回退到简单拼接: {e}")
+        logger.warning("[AGG] LLM 总结失败，回退到简单拼接: %s", e)
         # 兜底：使用简单拼接
         final_response = _build_markdown_response(expert_results, strategy)
 
@@ -136,13 +137,13 @@ async def aggregator_node(state: AgentState, config: RunnableConfig = None) -> d
                         from crud.agent_run import mark_run_completed_by_id
 
                         mark_run_completed_by_id(db_session, run_id)
-                        logger.info(f"[AGG] AgentRun {run_id} 状态更新为 completed")
+                        logger.info("[AGG] AgentRun %s 状态更新为 completed", run_id)
 
             await asyncio.to_thread(_save_execution_plan)
         except Exception as e:
-            logger.warning(f"[AGG] 保存 ExecutionPlan 失败: {e}")
+            logger.warning("[AGG] 保存 ExecutionPlan 失败: %s", e)
 
-    logger.info(f"[AGG] 聚合完成，回复长度: {len(final_response)}")
+    logger.info("[AGG] 聚合完成，回复长度: %s", len(final_response))
 
     # ✅ 返回 task_list 以确保 chat.py 能收集到所有任务状态
     return {
@@ -185,7 +186,7 @@ def _load_aggregator_system_prompt(input_data: str) -> str:
                 _aggregator_config_cache["aggregator"] = config
                 logger.info("[AGG] 全局缓存命中: System Prompt")
         except Exception as e:
-            logger.warning(f"[AGG] 从数据库加载失败: {e}")
+            logger.warning("[AGG] 从数据库加载失败: %s", e)
 
     # L3: 兜底到静态常量
     if not system_prompt:
@@ -44,6 +44,8 @@ CommanderOutput:
 import asyncio
 import logging
 import os
+import re
+import uuid
 from typing import Any
 
 from cachetools import TTLCache
@@ -59,10 +61,27 @@ from tenacity import (
     wait_fixed,
 )
 
+from agents.services.expert_manager import (
+    format_expert_list_for_prompt,
+    get_all_expert_list,
+    get_expert_config,
+    get_expert_config_cached,
+)
+from agents.services.task_manager import get_or_create_execution_plan
 from agents.state import AgentState
 from agents.state_patch import append_sse_event, get_event_queue_snapshot
 from constants import COMMANDER_SYSTEM_PROMPT
+from crud.execution_plan import get_subtasks_by_execution_plan
+from crud.run_event import emit_plan_created
 from database import engine
+from models import SubTaskCreate, Thread
+from providers_config import get_model_config
+from utils.event_generator import (
+    event_plan_created,
+    event_plan_started,
+    event_plan_thinking,
+    sse_event_to_string,
+)
 from utils.json_parser import parse_llm_json
 from utils.llm_factory import get_llm_instance
 from utils.logger import logger
@@ -73,6 +92,9 @@ _commander_config_cache: TTLCache = TTLCache(maxsize=10, ttl=300)
 # 专家列表缓存（相对稳定）
 _all_experts_cache: TTLCache = TTLCache(maxsize=5, ttl=60)  # 1分钟TTL，更频繁更新
 
+# 流式兜底规划时 thinking 片段的合并阈值（字符数），避免每个 token 生成一个事件
+_THINKING_FLUSH_CHARS = 256
+
 
 # ============================================================================
 # Commander 2.0: Pydantic 结构化输出模型
@@ -146,8 +168,6 @@ async def _preload_expert_configs(task_list: list[dict]) -> None:
 
     # P0 修复: 将数据库操作包装在 to_thread 中
     def _load_configs():
-        from agents.services.expert_manager import get_expert_config, get_expert_config_cached
-
         loaded_count = 0
         with Session(engine) as db_session:
             for expert_type in expert_types:
@@ -178,22 +198,6 @@ async def commander_node(state: AgentState, config: RunnableConfig = None) -> di
     v3.3 更新：流式思考 + JSON 生成，先展示思考过程，后输出任务规划
     v3.4 更新：使用事件驱动流式输出，通过 event_queue 实时推送 plan.thinking 事件
     """
-    import uuid
-
-    from agents.services.expert_manager import (
-        format_expert_list_for_prompt,
-        get_all_expert_list,
-        get_expert_config,
-        get_expert_config_cached,
-    )
-    from agents.services.task_manager import get_or_create_execution_plan
-    from models import SubTaskCreate
-    from utils.event_generator import (
-        event_plan_created,
-        event_plan_started,
-        sse_event_to_string,
-    )
-
     # 🔥 初始化事件队列（用于收集所有事件）
     event_queue = get_event_queue_snapshot(state)
 
@@ -281,8 +285,6 @@ async def commander_node(state: AgentState, config: RunnableConfig = None) -> di
                         logger.info(f"[COMMANDER] 已注入占位符: {{{placeholder}}}")
 
                 # 检查是否还有未填充的占位符（警告但不中断）
-                import re
-
                 remaining_placeholders = re.findall(r"\{([a-zA-Z_][a-zA-Z0-9_]*)\}", system_prompt)
                 if remaining_placeholders:
                     logger.warning(f"[COMMANDER] 警告: 以下占位符未填充: {remaining_placeholders}")
@@ -293,8 +295,7 @@ async def commander_node(state: AgentState, config: RunnableConfig = None) -> di
 
             # 执行 LLM 进行规划
             # 从模型名称推断 provider
-            from agents.graph import get_commander_llm_lazy
-            from providers_config import get_model_config
+            from agents.graph import get_commander_llm_lazy  # 延迟导入：graph_builder 依赖本模块
 
             model_config = get_model_config(model)
 
@@ -398,9 +399,6 @@ async def commander_node(state: AgentState, config: RunnableConfig = None) -> di
                 run_id = state.get("run_id")
 
                 def _create_execution_plan():
-                    from crud.execution_plan import get_subtasks_by_execution_plan
-                    from crud.run_event import emit_plan_created
-
                     with Session(engine) as db_session:
                         created_plan, is_reused = get_or_create_execution_plan(
                             db=db_session,
@@ -449,8 +447,6 @@ async def commander_node(state: AgentState, config: RunnableConfig = None) -> di
 
                 # 🔥🔥🔥 更新 thread.execution_plan_id，确保前端能查询到
                 # P0 修复: 使用 asyncio.to_thread 避免阻塞事件循环
-                from models import Thread
-
                 def _update_thread():
                     with Session(engine) as db_session:
                         thread = db_session.get(Thread, thread_id)
@@ -606,8 +602,6 @@ async def _generate_plan_once(
     """
     单次生成执行计划（用于 tenacity 重试）
     """
-    from utils.event_generator import event_plan_thinking, sse_event_to_string
-
     json_mode_llm = llm_with_config.bind(response_format={"type": "json_object"})
 
     response = await json_mode_llm.ainvoke(
@@ -688,11 +682,21 @@ async def _streaming_planning_fallback(
 
     当 JSON Mode 也完全不可用时使用
     """
-    from utils.event_generator import event_plan_thinking, sse_event_to_string
-
     thinking_content = ""
     json_buffer = ""
     is_json_phase = False
+    # 待发送的 thinking 片段：累计到阈值或进入 JSON 阶段时合并为一个 plan.thinking 事件
+    pending_thinking: list[str] = []
+    pending_len = 0
+
+    def flush_thinking(queue: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        nonlocal pending_len
+        thinking_event = event_plan_thinking(
+            execution_plan_id=preview_execution_plan_id, delta="".join(pending_thinking)
+        )
+        pending_thinking.clear()
+        pending_len = 0
+        return append_sse_event(queue, sse_event_to_string(thinking_event))
 
     logger.info("[COMMANDER] Fallback: 使用流式解析...")
 
@@ -703,7 +707,8 @@ async def _streaming_planning_fallback(
             metadata={"node_type": "commander", "mode": "fallback"},
         ),
     ):
-        content = chunk.content if hasattr(chunk, "content") else str(chunk)
+        # 聊天模型 astream 只产出 AIMessageChunk，直接读取 content（可能为空串）
+        content = chunk.content
         if not content:
             continue
 
@@ -713,20 +718,19 @@ async def _streaming_planning_fallback(
                 before_json = content.split("```")[0]
                 if before_json.strip():
                     thinking_content += before_json
-                    thinking_event = event_plan_thinking(
-                        execution_plan_id=preview_execution_plan_id, delta=before_json
-                    )
-                    event_queue = append_sse_event(event_queue, sse_event_to_string(thinking_event))
+                    pending_thinking.append(before_json)
+                if pending_thinking:
+                    event_queue = flush_thinking(event_queue)
                 json_parts = content.split("```", 1)
                 if len(json_parts) > 1:
                     json_buffer += json_parts[1]
                 continue
 
             thinking_content += content
-            thinking_event = event_plan_thinking(
-                execution_plan_id=preview_execution_plan_id, delta=content
-            )
-            event_queue = append_sse_event(event_queue, sse_event_to_string(thinking_event))
+            pending_thinking.append(content)
+            pending_len += len(content)
+            if pending_len >= _THINKING_FLUSH_CHARS:
+                event_queue = flush_thinking(event_queue)
         else:
             if "```" in content:
                 json_parts = content.split("```", 1)
@@ -734,6 +738,9 @@ async def _streaming_planning_fallback(
             else:
                 json_buffer += content
 
+    if pending_thinking:
+        event_queue = flush_thinking(event_queue)
+
     # 解析 JSON
     json_str = json_buffer.strip()
     if json_str.startswith("json"):
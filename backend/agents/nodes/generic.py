@@ -55,22 +55,42 @@ v3.7 优化: P0 修复 + TTLCache 本地内存缓存高频查询
 
 import asyncio  # 🔥 用于异步保存专家执行结果
 import json
+import logging
 import os
 import re
+import time
+import uuid
 from datetime import datetime
 from typing import Any
 
 from cachetools import TTLCache
 from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage, ToolMessage
+from langchain_core.messages.utils import count_tokens_approximately, trim_messages
 from langchain_core.runnables import RunnableConfig
-
-from agents.services.expert_manager import get_expert_config_cached
-from agents.state_patch import append_sse_event, get_event_queue_snapshot, replace_task_item
+from sqlmodel import Session
+
+from agents.services.expert_manager import get_expert_config, get_expert_config_cached
+from agents.state_patch import (
+    append_sse_event,
+    append_sse_events,
+    get_event_queue_snapshot,
+    replace_task_item,
+)
 from agents.tool_policy import filter_tools_for_binding
-from providers_config import get_model_config, load_providers_config
+from database import engine
+from event_types.events import dumps_event_data
+from providers_config import get_model_spec
 from services.memory_manager import memory_manager  # 🔥 导入记忆管理器
 from services.tool_policy_service import tool_policy_service
 from tools import ALL_TOOLS as BASE_TOOLS  # 🔥 MCP: 导入基础工具集
+from utils.async_task_queue import async_append_run_event, enqueue_expert_result_save
+from utils.event_generator import (
+    event_artifact_generated,
+    event_task_completed,
+    event_task_failed,
+    event_task_started,
+    sse_event_to_string,
+)
 from utils.llm_factory import get_effective_model, get_expert_llm
 from utils.logger import logger
 from utils.prompt_utils import enhance_system_prompt_with_tools  # v3.6: 提取到工具函数
@@ -78,6 +98,32 @@ from utils.prompt_utils import enhance_system_prompt_with_tools  # v3.6: 提取
 # P0 优化: 本地内存缓存高频专家配置查询 (5分钟TTL, 最大200条)
 _generic_expert_cache: TTLCache = TTLCache(maxsize=200, ttl=300)
 
+# 负缓存: 记录数据库中也不存在的 expert_type，避免未知专家反复回源查库 (1分钟TTL)
+_missing_expert_cache: TTLCache = TTLCache(maxsize=256, ttl=60)
+
+# 基础工具集快照（不可变，无 MCP 工具时直接复用，避免每个任务重新拷贝列表）
+_BASE_TOOLS_TUPLE: tuple[Any, ...] = tuple(BASE_TOOLS)
+
+# 转发给专家 LLM 的对话历史 token 预算（近似计数），超出时只保留最近的完整回合
+_HISTORY_TOKEN_BUDGET = int(os.getenv("EXPERT_HISTORY_MAX_TOKENS", "4000"))
+
+# 参数绑定缓存: (LLM, 模型, 温度) -> llm.bind(model, temperature) 的结果
+# 仅用于外部传入 / 兜底 provider 创建的 LLM，工厂实例无需 bind
+_bound_model_cache: TTLCache = TTLCache(maxsize=64, ttl=300)
+
+# 工具绑定缓存: (LLM, 模型, 温度, 工具集) -> 已绑定工具的 Runnable
+# bind_tools 每次都会重新生成全部工具的 JSON Schema，命中缓存可直接复用
+_bound_tools_cache: TTLCache = TTLCache(maxsize=64, ttl=300)
+
+# Artifact 类型检测（模块级预编译，只做命中判断，不需要捕获组）
+# 全部大小写不敏感匹配，避免对整段回复做 lower() 拷贝
+_HTML_DOC_START_RE = re.compile(r"\s*(?:<!doctype html|<html)", re.IGNORECASE)
+# "<html" 标签与 "```html" 代码块起始合并为一次扫描，命中后再向后确认闭合
+_HTML_MARKER_RE = re.compile(r"(<html)|```html\n", re.IGNORECASE)
+_HTML_CLOSE_TAG_RE = re.compile(r"</html>", re.IGNORECASE)
+# "# " 已覆盖 "## " / "### "，一次扫描即可判断所有 Markdown 标记与代码块
+_MARKDOWN_MARKER_RE = re.compile(r"# |> |- |\* |```")
+
 
 class GenericWorkerError(Exception):
     """Generic Worker 业务异常基类。"""
@@ -87,6 +133,65 @@ class ExpertExecutionError(GenericWorkerError):
     """专家执行失败（LLM 调用 / 工具流程）异常。"""
 
 
+def _load_expert_from_db(expert_type: str) -> dict | None:
+    """同步查询数据库中的专家配置（在线程池中执行，供缓存未命中时回源）"""
+    with Session(engine) as session:
+        return get_expert_config(expert_type, session)
+
+
+def _bind_model_cached(llm, model: str, temperature: float) -> Any:
+    """按 (LLM 实例, 模型, 温度) 缓存 llm.bind 结果，相同参数的任务复用同一个 Runnable"""
+    key = (id(llm), model, temperature)
+    cached = _bound_model_cache.get(key)
+    if cached is not None and cached[0] is llm:
+        return cached[1]
+
+    bound = llm.bind(model=model, temperature=temperature)
+    _bound_model_cache[key] = (llm, bound)
+    return bound
+
+
+def _trim_history_for_llm(messages: list[BaseMessage]) -> list[BaseMessage]:
+    """
+    按 token 预算裁剪对话历史（保留最近的消息）
+
+    裁剪结果总是从 HumanMessage 开始，AIMessage(tool_calls) 与对应 ToolMessage 不会被拆开；
+    预算连当前回合都容纳不下时，保留最后一条 HumanMessage 起的完整回合。
+    """
+    if count_tokens_approximately(messages) <= _HISTORY_TOKEN_BUDGET:
+        return messages
+
+    trimmed = trim_messages(
+        messages,
+        max_tokens=_HISTORY_TOKEN_BUDGET,
+        token_counter=count_tokens_approximately,
+        strategy="last",
+        start_on="human",
+        allow_partial=False,
+    )
+    if trimmed:
+        return trimmed
+
+    last_human_index = next(
+        (i for i in range(len(messages) - 1, -1, -1) if isinstance(messages[i], HumanMessage)),
+        0,
+    )
+    return messages[last_human_index:]
+
+
+def _bind_tools_cached(llm, llm_with_config, model: str, temperature: float, tools) -> Any:
+    """按 (LLM 实例, 模型, 温度, 工具集) 缓存 bind_tools 结果"""
+    key = (id(llm), model, temperature, tuple(id(tool) for tool in tools))
+    cached = _bound_tools_cache.get(key)
+    # 缓存值持有 LLM 与工具的强引用，id 在条目存活期间不会被复用；这里再校验一次身份
+    if cached is not None and cached[0] is llm:
+        return cached[2]
+
+    bound = llm_with_config.bind_tools(tools)
+    _bound_tools_cache[key] = (llm, tuple(tools), bound)
+    return bound
+
+
 def normalize_message_content(content: str | list | Any) -> str:
     """
     将消息内容规范化为字符串格式。
@@ -102,11 +207,9 @@ def normalize_message_content(content: str | list | Any) -> str:
     """
     if isinstance(content, str):
         return content
-    if isinstance(content, list):
-        # 将列表转换为 JSON 字符串
-        return json.dumps(content, ensure_ascii=False)
-    if isinstance(content, dict):
-        return json.dumps(content, ensure_ascii=False)
+    if isinstance(content, list | dict):
+        # 将列表/字典转换为 JSON 字符串（与 SSE 事件共用同一序列化函数）
+        return dumps_event_data(content)
     # 其他类型转为字符串
     return str(content)
 
@@ -132,25 +235,27 @@ def normalize_messages_for_llm(
     if content_mode == "auto":
         return messages
 
+    # 先扫描：所有 ToolMessage 的 content 已是字符串时直接返回原列表（零分配）
+    if not any(
+        isinstance(msg, ToolMessage) and not isinstance(msg.content, str) for msg in messages
+    ):
+        return messages
+
     # string 模式下需要转换 ToolMessage content
     normalized = []
     for msg in messages:
-        if isinstance(msg, ToolMessage):
+        if isinstance(msg, ToolMessage) and not isinstance(msg.content, str):
             # ToolMessage 的 content 可能是 list/dict，需要转换为字符串
-            normalized_content = normalize_message_content(msg.content)
-            if normalized_content != msg.content:
-                # 创建新的 ToolMessage，保留其他字段
-                normalized.append(
-                    ToolMessage(
-                        content=normalized_content,
-                        tool_call_id=msg.tool_call_id,
-                        name=msg.name,
-                        additional_kwargs=msg.additional_kwargs,
-                        response_metadata=msg.response_metadata,
-                    )
+            # 创建新的 ToolMessage，保留其他字段
+            normalized.append(
+                ToolMessage(
+                    content=normalize_message_content(msg.content),
+                    tool_call_id=msg.tool_call_id,
+                    name=msg.name,
+                    additional_kwargs=msg.additional_kwargs,
+                    response_metadata=msg.response_metadata,
                 )
-            else:
-                normalized.append(msg)
+            )
         else:
             normalized.append(msg)
     return normalized
@@ -181,112 +286,91 @@ async def generic_worker_node(
     Returns:
         Dict: 执行结果，包含 output_result, status, artifact 等
     """
-    from langchain_core.messages import ToolMessage
-
     # 获取当前任务
     task_list = state.get("task_list", [])
     current_index = state.get("current_task_index", 0)
     existing_messages = state.get("messages", [])
 
     if current_index >= len(task_list):
-        return {
-            "output_result": "没有待执行的任务",
-            "status": "failed",
-            "error": "Task index out of range",
-            "started_at": datetime.now().isoformat(),
-            "completed_at": datetime.now().isoformat(),
-        }
+        return _early_failure_result("没有待执行的任务", "Task index out of range")
 
     current_task = task_list[current_index]
     expert_type = current_task.get("expert_type", "")
     description = current_task.get("description", "")
     input_data = current_task.get("input_data", {})
+    # 任务标识只解析一次，started / completed / failed 各路径复用
+    # expert_results 使用 Commander ID (如 "task_0")，下游 depends_on 按它匹配；db_uuid 为数据库 UUID
+    semantic_id = current_task.get("task_id")
+    db_uuid = current_task.get("id")
+    record_id = semantic_id if semantic_id else db_uuid
 
     if not expert_type:
-        return {
-            "output_result": "任务缺少 expert_type 字段",
-            "status": "failed",
-            "error": "Missing expert_type in task",
-            "started_at": datetime.now().isoformat(),
-            "completed_at": datetime.now().isoformat(),
-        }
+        return _early_failure_result("任务缺少 expert_type 字段", "Missing expert_type in task")
 
     # P0 修复 + 优化: 优先使用本地内存缓存，缓存未命中才查数据库
     # 1️⃣ 优先从本地内存缓存读取（不走线程池，零阻塞）
     expert_config = _generic_expert_cache.get(expert_type)
     if expert_config:
-        logger.info(f"[GenericWorker] 本地缓存命中: {expert_type}")
+        logger.info("[GenericWorker] 本地缓存命中: %s", expert_type)
     else:
         # 2️⃣ 检查全局缓存
         expert_config = get_expert_config_cached(expert_type)
         if expert_config:
-            logger.info(f"[GenericWorker] 全局缓存命中: {expert_type}")
+            logger.info("[GenericWorker] 全局缓存命中: %s", expert_type)
             # 同步到本地缓存
             _generic_expert_cache[expert_type] = expert_config
+        elif expert_type in _missing_expert_cache:
+            # 3️⃣ 负缓存命中：近期已确认数据库中不存在，直接跳过回源
+            logger.info("[GenericWorker] 负缓存命中，跳过数据库查询: %s", expert_type)
         else:
-            # 3️⃣ 缓存未命中，可能是自定义专家，尝试直接查数据库
-            logger.info(f"[GenericWorker] 缓存未命中，查询数据库: {expert_type}")
-            from sqlmodel import Session
-
-            from agents.services.expert_manager import get_expert_config
-            from database import engine
-
+            # 4️⃣ 缓存未命中，可能是自定义专家，尝试直接查数据库
+            logger.info("[GenericWorker] 缓存未命中，查询数据库: %s", expert_type)
             # P0 修复: 使用 asyncio.to_thread 避免阻塞事件循环
-            def _load_expert_config():
-                with Session(engine) as session:
-                    return get_expert_config(expert_type, session)
-
-            expert_config = await asyncio.to_thread(_load_expert_config)
+            expert_config = await asyncio.to_thread(_load_expert_from_db, expert_type)
             if expert_config:
-                logger.info(f"[GenericWorker] 从数据库加载成功: {expert_type}")
-                # 4️⃣ 写入本地缓存
+                logger.info("[GenericWorker] 从数据库加载成功: %s", expert_type)
+                # 5️⃣ 写入本地缓存
                 _generic_expert_cache[expert_type] = expert_config
+            else:
+                _missing_expert_cache[expert_type] = True
 
     if not expert_config:
-        return {
-            "output_result": f"专家 '{expert_type}' 未找到",
-            "status": "failed",
-            "error": f"Expert '{expert_type}' not found in database",
-            "started_at": datetime.now().isoformat(),
-            "completed_at": datetime.now().isoformat(),
-        }
+        return _early_failure_result(
+            f"专家 '{expert_type}' 未找到", f"Expert '{expert_type}' not found in database"
+        )
 
-    started_at = datetime.now()
+    started_iso = datetime.now().isoformat()
+    # 耗时使用单调时钟，不受系统时间调整影响
+    started_perf = time.perf_counter()
 
     # ✅ 发送 task.started 事件（专家开始执行）
-    from utils.event_generator import event_task_started, sse_event_to_string
-
     task_id = current_task.get("id", str(current_index))
     started_event = event_task_started(
         task_id=task_id, expert_type=expert_type, description=description
     )
-    # 将 started 事件放入 state 的 event_queue，让 dispatcher 或其他节点处理
+    # started 事件先序列化，在节点返回时与后续事件一起一次性并入 event_queue
     # 使用不可变更新，避免原地修改上游 state 对象
-    initial_event_queue = append_sse_event(
-        get_event_queue_snapshot(state),
-        sse_event_to_string(started_event),
-    )
-    logger.info(f"[GenericWorker] 已生成 task.started 事件: {expert_type}")
+    base_event_queue = get_event_queue_snapshot(state)
+    started_event_str = sse_event_to_string(started_event)
+    logger.info("[GenericWorker] 已生成 task.started 事件: %s", expert_type)
 
     run_id = state.get("run_id")
     thread_id = state.get("thread_id")
     execution_plan_id = state.get("execution_plan_id")
     if run_id and thread_id:
         try:
-            from utils.async_task_queue import async_append_run_event
-
             asyncio.create_task(
                 async_append_run_event(
                     run_id=run_id,
                     event_type="task_started",
                     thread_id=thread_id,
                     execution_plan_id=execution_plan_id,
-                    task_id=str(current_task.get("id", task_id)),
+                    task_id=str(task_id),
                     event_data={"expert_type": expert_type, "description": description},
                 )
             )
         except (RuntimeError, ValueError) as event_err:
-            logger.warning(f"[GenericWorker] ⚠️ task_started 账本写入提交失败: {event_err}")
+            logger.warning("[GenericWorker] ⚠️ task_started 账本写入提交失败: %s", event_err)
 
     try:
         # 获取专家配置参数
@@ -297,45 +381,47 @@ async def generic_worker_node(
         configured_model = expert_config.get("model")
         effective_model = get_effective_model(configured_model)
 
-        # 获取模型配置以确定实际的 API 模型名称和温度
-        model_config = get_model_config(effective_model)
-        if model_config:
-            actual_model = model_config.get("model", effective_model)
-            temperature = model_config.get("temperature", expert_config.get("temperature", 0.7))
-            provider = model_config.get("provider")
+        # 获取预解析的模型参数：实际 API 模型名、温度、provider 及其 content_mode
+        model_spec = get_model_spec(effective_model)
+        if model_spec:
+            actual_model = model_spec.api_model
+            temperature = model_spec.temperature
+            if temperature is None:
+                temperature = expert_config.get("temperature", 0.7)
+            provider = model_spec.provider
+            # 🔥🔥🔥 provider 的 content_mode 配置（未配置 provider 时为 string 模式）
+            content_mode = model_spec.content_mode
         else:
             actual_model = effective_model
             temperature = expert_config.get("temperature", 0.7)
             provider = None
-
-        # 🔥🔥🔥 获取 provider 的 content_mode 配置
-        content_mode = "string"  # 默认使用 string 模式（安全）
-        if provider:
-            providers_config = load_providers_config()
-            provider_config = providers_config.get("providers", {}).get(provider, {})
-            content_mode = provider_config.get("content_mode", "string")
+            content_mode = "string"  # 默认使用 string 模式（安全）
 
         logger.info(
-            f"[GenericWorker] Running '{expert_type}' ({expert_name}) with model={actual_model}, temp={temperature}, content_mode={content_mode}"
+            "[GenericWorker] Running '%s' (%s) with model=%s, temp=%s, content_mode=%s",
+            expert_type,
+            expert_name,
+            actual_model,
+            temperature,
+            content_mode,
         )
 
         # 如果没有提供 LLM 实例，根据配置创建
-        if llm is None:
-            # 根据模型配置获取 provider
-            if model_config:
-                provider = model_config.get("provider")
-                llm = get_expert_llm(provider=provider, model=actual_model, temperature=temperature)
-            else:
+        if llm is None and provider:
+            # 工厂按 (provider, model, temperature) 缓存并创建实例，参数已生效，无需再 bind
+            llm = get_expert_llm(provider=provider, model=actual_model, temperature=temperature)
+            llm_with_config = llm
+        else:
+            if llm is None:
                 llm = get_expert_llm(model=actual_model, temperature=temperature)
-
-        # 绑定模型和温度参数
-        llm_with_config = llm.bind(model=actual_model, temperature=temperature)
+            # 外部传入或兜底 provider 创建的实例：绑定模型和温度参数
+            llm_with_config = _bind_model_cached(llm, actual_model, temperature)
 
         # 🔥🔥🔥 GenericWorker 2.0: 占位符填充 + System Prompt 增强
         # 填充 {input} 占位符（任务描述）
         if "{input}" in system_prompt:
             system_prompt = system_prompt.replace("{input}", description)
-            logger.info(f"[GenericWorker] 已注入占位符: {{input}} = {description[:50]}...")
+            logger.info("[GenericWorker] 已注入占位符: {input} = %s...", description[:50])
 
         # 增强 System Prompt (注入时间 + 工具指令)
         enhanced_system_prompt = enhance_system_prompt_with_tools(system_prompt)
@@ -348,16 +434,20 @@ async def generic_worker_node(
             # 工具执行后的情况：messages 包含 AIMessage(tool_calls) + ToolMessage
             # 我们需要保留这些上下文，让 LLM 看到工具结果
             # 检查最后一条是否是 ToolMessage
-            if existing_messages and isinstance(existing_messages[-1], ToolMessage):
+            if isinstance(existing_messages[-1], ToolMessage):
                 has_tool_message = True
 
             # 🔥🔥🔥 关键修复：规范化 ToolMessage content
             # 根据 provider 的 content_mode 决定是否转换（string 模式需转换，auto 模式保持原样）
-            normalized_existing = normalize_messages_for_llm(existing_messages, content_mode)
+            if content_mode != "auto":
+                existing_messages = normalize_messages_for_llm(existing_messages, content_mode)
+
+            # 长对话只转发预算内的最近历史，控制 prefill 成本
+            existing_messages = _trim_history_for_llm(existing_messages)
 
             messages_for_llm = [
                 SystemMessage(content=enhanced_system_prompt),
-                *normalized_existing,  # 包含 AIMessage(tool_calls) 和 ToolMessage
+                *existing_messages,  # 包含 AIMessage(tool_calls) 和 ToolMessage
             ]
         else:
             # 首次调用：创建新的消息列表
@@ -372,26 +462,33 @@ async def generic_worker_node(
             if depends_on:
                 # 查找依赖任务的输出
                 # 🔥🔥🔥 关键修复：双保险匹配，支持 task_id 和 db_uuid
+                # 预建索引：一次遍历同时登记 task_id / db_uuid，避免每个依赖都线性扫描
+                results_by_id: dict[str, dict[str, Any]] = {}
+                for r in expert_results:
+                    for key in (r.get("task_id"), r.get("db_uuid")):
+                        if key is not None:
+                            results_by_id.setdefault(key, r)
+                available_task_ids = None
+
                 for dep_id in depends_on:
-                    dep_result = next(
-                        (
-                            r
-                            for r in expert_results
-                            if r.get("task_id") == dep_id or r.get("db_uuid") == dep_id
-                        ),
-                        None,
-                    )
+                    dep_result = results_by_id.get(dep_id)
                     if dep_result and dep_result.get("output"):
                         context_parts.append(
                             f"【上游任务 {dep_id} 的输出】:\n{dep_result['output'][:2000]}..."
                         )
                         logger.info(
-                            f"[GenericWorker] ✅ 找到依赖 {dep_id}: {len(dep_result['output'])} 字符"
+                            "[GenericWorker] ✅ 找到依赖 %s: %d 字符",
+                            dep_id,
+                            len(dep_result["output"]),
                         )
                     else:
                         missing_deps.append(dep_id)
+                        if available_task_ids is None:
+                            available_task_ids = [r.get("task_id") for r in expert_results]
                         logger.warning(
-                            f"[GenericWorker] ⚠️ 未找到依赖 {dep_id}, 可用结果: {[r.get('task_id') for r in expert_results]}"
+                            "[GenericWorker] ⚠️ 未找到依赖 %s, 可用结果: %s",
+                            dep_id,
+                            available_task_ids,
                         )
 
             # 组装任务提示
@@ -430,7 +527,9 @@ async def generic_worker_node(
                         mcp_tools = config.get("configurable", {}).get("mcp_tools", [])
 
                     # 🔥 MCP: 合并基础工具和动态 MCP 工具
-                    runtime_tools = list(BASE_TOOLS) + list(mcp_tools)
+                    runtime_tools = (
+                        (*_BASE_TOOLS_TUPLE, *mcp_tools) if mcp_tools else _BASE_TOOLS_TUPLE
+                    )
                     policy_overrides = await tool_policy_service.get_overrides()
                     bindable_tools, blocked_tools = filter_tools_for_binding(
                         runtime_tools,
@@ -442,11 +541,17 @@ async def generic_worker_node(
                     if not mcp_tools and os.getenv("MCP_SERVERS"):
                         logger.warning("[GenericWorker] ⚠️ MCP 工具为空！请检查 MCP 服务器连接")
 
-                    llm_to_use = llm_with_config.bind_tools(bindable_tools)
+                    # 治理层过滤后没有可用工具：跳过 bind_tools，请求中也不再携带工具描述
+                    if bindable_tools:
+                        llm_to_use = _bind_tools_cached(
+                            llm, llm_with_config, actual_model, temperature, bindable_tools
+                        )
+                    else:
+                        llm_to_use = llm_with_config
                     logger.info(
                         "[GenericWorker] 🔧 工具已绑定: %s 个工具 (基础: %s, MCP: %s, 被治理层过滤: %s)",
                         len(bindable_tools),
-                        len(BASE_TOOLS),
+                        len(_BASE_TOOLS_TUPLE),
                         len(mcp_tools),
                         len(blocked_tools),
                     )
@@ -459,7 +564,9 @@ async def generic_worker_node(
                             blocked.reason,
                         )
                 except Exception as e:
-                    logger.warning(f"[GenericWorker] ⚠️ 工具绑定失败（模型可能不支持工具调用）: {e}")
+                    logger.warning(
+                        "[GenericWorker] ⚠️ 工具绑定失败（模型可能不支持工具调用）: %s", e
+                    )
                     llm_to_use = llm_with_config
             else:
                 logger.info("[GenericWorker] ⏭️ 工具调用已禁用（ENABLE_TOOL_CALLING=false）")
@@ -491,36 +598,39 @@ async def generic_worker_node(
             raise ExpertExecutionError(f"LLM 调用失败: {exc}") from exc
 
         # 生成 artifact_id
-        import uuid
-
         artifact_id = str(uuid.uuid4())
 
         # 🔥 关键修复：检查响应中是否包含工具调用
         has_tool_calls = hasattr(response, "tool_calls") and response.tool_calls
 
         if has_tool_calls:
-            logger.info(f"[GenericWorker] 🔧 LLM 返回了工具调用！数量: {len(response.tool_calls)}")
-            for tool_call in response.tool_calls:
-                tool_name = tool_call.get("name", "unknown")
-                tool_args = tool_call.get("args", {})
-                logger.info(
-                    f"[GenericWorker]   - 工具: {tool_name} | 专家: {expert_type} | 任务: {task_id}"
-                )
-                # 🔥 详细的工具调用日志（用于分析）
-                logger.info(
-                    "[ToolUsage] expert=%s tool=%s task_id=%s args=%s",
-                    expert_type,
-                    tool_name,
-                    task_id,
-                    str(tool_args)[:200],
-                )
+            logger.info("[GenericWorker] 🔧 LLM 返回了工具调用！数量: %d", len(response.tool_calls))
+            # 🔥 逐个工具调用的明细日志仅在 INFO 级别开启时才展开，避免生产环境拼接 args 字符串
+            if logger.isEnabledFor(logging.INFO):
+                for tool_call in response.tool_calls:
+                    tool_name = tool_call.get("name", "unknown")
+                    logger.info(
+                        "[GenericWorker]   - 工具: %s | 专家: %s | 任务: %s",
+                        tool_name,
+                        expert_type,
+                        task_id,
+                    )
+                    # 🔥 详细的工具调用日志（用于分析）
+                    logger.info(
+                        "[ToolUsage] expert=%s tool=%s task_id=%s args=%s",
+                        expert_type,
+                        tool_name,
+                        task_id,
+                        str(tool_call.get("args", {}))[:200],
+                    )
             # 🔥🔥 关键：返回 messages 让 ToolNode 处理工具调用
             # 此时不生成 task.completed 事件，因为任务还没完成
             return {
                 "messages": [response],  # 包含 tool_calls 的 AIMessage
                 "task_list": task_list,
                 "current_task_index": current_index,  # 不增加 index，等工具执行完再说
-                "event_queue": initial_event_queue,  # 只返回 started 事件
+                # 只返回 started 事件
+                "event_queue": append_sse_event(base_event_queue, started_event_str),
                 "__expert_info": {
                     "expert_type": expert_type,
                     "expert_name": expert_name,
@@ -533,10 +643,10 @@ async def generic_worker_node(
         # 没有工具调用，正常完成任务
         logger.info("[GenericWorker] ℹ️ LLM 返回了普通文本响应，未调用工具")
 
-        completed_at = datetime.now()
-        duration_ms = int((completed_at - started_at).total_seconds() * 1000)
+        completed_iso = datetime.now().isoformat()
+        duration_ms = int((time.perf_counter() - started_perf) * 1000)
 
-        logger.info(f"[GenericWorker] '{expert_type}' completed (耗时: {duration_ms / 1000:.2f}s)")
+        logger.info("[GenericWorker] '%s' completed (耗时: %.2fs)", expert_type, duration_ms / 1000)
 
         # -------------------------------------------------------------
         # 🔥 新增逻辑：如果是记忆专家，执行"写入数据库"操作
@@ -547,7 +657,7 @@ async def generic_worker_node(
             user_id = state.get("user_id", "default_user")
 
             if memory_content:
-                logger.info(f"[GenericWorker] 正在保存记忆: {memory_content}")
+                logger.info("[GenericWorker] 正在保存记忆: %s", memory_content)
                 try:
                     # 异步调用 memory_manager 保存 (内部使用了 to_thread)
                     await memory_manager.add_memory(
@@ -561,12 +671,15 @@ async def generic_worker_node(
                     response_content_original = response.content
                     response.content = f"已为您记录：{response_content_original}"
                 except (RuntimeError, ValueError) as mem_err:
-                    logger.warning(f"[GenericWorker] 记忆保存失败: {mem_err}")
+                    logger.warning("[GenericWorker] 记忆保存失败: %s", mem_err)
                     response.content = f"记录时遇到问题，但我会记住：{memory_content}"
         # -------------------------------------------------------------
 
+        # 最终回复内容只取一次，后续 artifact / expert_result / 事件统一复用
+        response_content = response.content
+
         # 🔥 检测 artifact 类型
-        artifact_type = _detect_artifact_type(response.content, expert_type)
+        artifact_type = _detect_artifact_type(response_content, expert_type)
 
         # ✅ v3.2 修复：增加 current_task_index 以支持循环
         # Generic Worker 执行完任务后，需要递增 index 才能执行下一个任务
@@ -577,31 +690,30 @@ async def generic_worker_node(
             task_list,
             current_index,
             {
-                "output_result": {"content": response.content},
+                "output_result": {"content": response_content},
                 "status": "completed",
-                "completed_at": completed_at.isoformat(),
+                "completed_at": completed_iso,
             },
         )
 
         # ✅ 添加到 expert_results（用于后续任务依赖和最终聚合）
         # 🔥🔥🔥 关键修复：使用 task_id (Commander ID, 如 "task_0") 而不是 id (UUID)
         # 下游任务通过 depends_on: ["task_0"] 查找，必须用相同格式才能匹配
-        semantic_id = current_task.get("task_id")  # Commander ID (如 "task_0")
-        db_uuid = current_task.get("id")  # 数据库 UUID (如 "550e8400...")
-        record_id = semantic_id if semantic_id else db_uuid  # 优先使用 semantic_id
-
         expert_result = {
             "task_id": record_id,  # 🔥 关键：使用 Commander ID 让下游能匹配到
             "db_uuid": db_uuid,  # 保留 UUID 方便调试
             "expert_type": expert_type,
             "description": description,
-            "output": response.content,
+            "output": response_content,
             "status": "completed",
             "duration_ms": duration_ms,
         }
 
         logger.info(
-            f"[GenericWorker] 保存专家结果: task_id={record_id}, db_uuid={db_uuid}, expert={expert_type}"
+            "[GenericWorker] 保存专家结果: task_id=%s, db_uuid=%s, expert=%s",
+            record_id,
+            db_uuid,
+            expert_type,
         )
 
         # 获取现有的 expert_results 并追加新结果
@@ -612,7 +724,7 @@ async def generic_worker_node(
         artifact = {
             "type": artifact_type,
             "title": f"{expert_name}结果",
-            "content": response.content,
+            "content": response_content,
             "language": None,  # 可选字段，Pydantic 模型需要
             "sort_order": 0,  # 默认排序
             "artifact_id": artifact_id,
@@ -622,31 +734,21 @@ async def generic_worker_node(
         # 🔥 修复：不传递 db_session，在 async_save_expert_result 中创建独立的 Session
         if task_id:
             try:
-                from utils.async_task_queue import async_save_expert_result
-
-                # 使用后台线程异步保存，不阻塞 LLM 响应返回
-                asyncio.create_task(
-                    async_save_expert_result(
-                        task_id=task_id,
-                        expert_type=expert_type,
-                        output_result=response.content,
-                        artifact_data=artifact,
-                        duration_ms=duration_ms,
-                    )
+                # 放入常驻保存队列，由后台消费者批量写库，不阻塞 LLM 响应返回
+                enqueue_expert_result_save(
+                    task_id=task_id,
+                    expert_type=expert_type,
+                    output_result=response_content,
+                    artifact_data=artifact,
+                    duration_ms=duration_ms,
                 )
-                logger.info(f"[GenericWorker] ✅ 专家执行结果已提交后台线程池保存: {expert_type}")
+                logger.info("[GenericWorker] ✅ 专家执行结果已提交后台保存队列: %s", expert_type)
             except (RuntimeError, ValueError) as save_err:
-                logger.warning(f"[GenericWorker] ⚠️ 后台保存提交失败: {save_err}")
+                logger.warning("[GenericWorker] ⚠️ 后台保存提交失败: %s", save_err)
         else:
-            logger.warning(f"[GenericWorker] ⚠️ 跳过保存: task_id={task_id}")
+            logger.warning("[GenericWorker] ⚠️ 跳过保存: task_id=%s", task_id)
 
         # ✅ 生成事件队列（用于前端展示专家和 artifact）
-        from utils.event_generator import (
-            event_artifact_generated,
-            event_task_completed,
-            sse_event_to_string,
-        )
-
         # 🔥 v4.0 重构：统一发送 artifact.generated 事件（批处理模式）
         # 所有专家完成后发送完整的 artifact 内容
         artifact_event = event_artifact_generated(
@@ -654,31 +756,30 @@ async def generic_worker_node(
             expert_type=expert_type,
             artifact_id=artifact_id,
             artifact_type=artifact_type,
-            content=response.content,
+            content=response_content,
             title=f"{expert_name}结果",
         )
-        logger.info(f"[GenericWorker] 已生成 artifact.generated 事件: {artifact_type}")
+        logger.info("[GenericWorker] 已生成 artifact.generated 事件: %s", artifact_type)
 
         # 1. 发送 task.completed 事件（专家执行完成）
         task_completed_event = event_task_completed(
             task_id=task_id,
             expert_type=expert_type,
             description=description,
-            output=response.content[:500] + "..."
-            if len(response.content) > 500
-            else response.content,
+            output=response_content,
             duration_ms=duration_ms,
             artifact_count=1,
+            max_output_len=500,  # 完整内容走 artifact.generated，这里只给预览
         )
-        logger.info(f"[GenericWorker] 已生成 task.completed 事件: {expert_type}")
-
-        # ✅ 合并 started / artifact.generated / task.completed 事件（不可变）
-        full_event_queue = append_sse_event(
-            initial_event_queue, sse_event_to_string(artifact_event)
-        )
-        full_event_queue = append_sse_event(
-            full_event_queue,
-            sse_event_to_string(task_completed_event),
+        logger.info("[GenericWorker] 已生成 task.completed 事件: %s", expert_type)
+
+        # ✅ 合并 started / artifact.generated / task.completed 事件（不可变，一次追加）
+        full_event_queue = append_sse_events(
+            base_event_queue,
+            [
+                started_event_str,
+                *(sse_event_to_string(e) for e in (artifact_event, task_completed_event)),
+            ],
         )
 
         return {
@@ -688,10 +789,10 @@ async def generic_worker_node(
             "task_list": updated_task_list,
             "expert_results": expert_results,
             "current_task_index": next_index,  # ✅ 增加 index
-            "output_result": response.content,
+            "output_result": response_content,
             "status": "completed",
-            "started_at": started_at.isoformat(),
-            "completed_at": completed_at.isoformat(),
+            "started_at": started_iso,
+            "completed_at": completed_iso,
             "duration_ms": duration_ms,
             "artifact": artifact,
             "event_queue": full_event_queue,  # ✅ 添加完整事件队列（包含 started 和 completed）
@@ -706,10 +807,11 @@ async def generic_worker_node(
         }
 
     except Exception as e:
+        failed_at = datetime.now()
         if isinstance(e, ExpertExecutionError):
-            logger.warning(f"[GenericWorker] '{expert_type}' 执行异常: {e}")
+            logger.warning("[GenericWorker] '%s' 执行异常: %s", expert_type, e)
         else:
-            logger.warning(f"[GenericWorker] '{expert_type}' failed: {e}")
+            logger.warning("[GenericWorker] '%s' failed: %s", expert_type, e)
 
         # ✅ 失败时也要增加 index，否则会卡死循环
         next_index = current_index + 1
@@ -726,9 +828,7 @@ async def generic_worker_node(
         # 获取现有的 expert_results 并添加失败记录
         expert_results = state.get("expert_results", [])
         # 🔥🔥🔥 关键修复：使用 task_id (Commander ID) 而不是 id (UUID)
-        semantic_id = current_task.get("task_id")
-        db_uuid = current_task.get("id")
-        task_id = semantic_id if semantic_id else db_uuid
+        task_id = record_id
         expert_result = {
             "task_id": task_id,  # 🔥 使用 Commander ID
             "db_uuid": db_uuid,  # 保留 UUID
@@ -742,20 +842,13 @@ async def generic_worker_node(
         expert_results = expert_results + [expert_result]
 
         # ✅ 生成 task.failed 事件
-        from utils.event_generator import event_task_failed, sse_event_to_string
-
         failed_event = event_task_failed(
             task_id=task_id, expert_type=expert_type, description=description, error=str(e)
         )
-        logger.info(f"[GenericWorker] 已生成 task.failed 事件: {expert_type}")
+        logger.info("[GenericWorker] 已生成 task.failed 事件: %s", expert_type)
 
-        run_id = state.get("run_id")
-        thread_id = state.get("thread_id")
-        execution_plan_id = state.get("execution_plan_id")
         if run_id and thread_id:
             try:
-                from utils.async_task_queue import async_append_run_event
-
                 asyncio.create_task(
                     async_append_run_event(
                         run_id=run_id,
@@ -767,10 +860,12 @@ async def generic_worker_node(
                     )
                 )
             except (RuntimeError, ValueError) as event_err:
-                logger.warning(f"[GenericWorker] ⚠️ task_failed 账本写入提交失败: {event_err}")
+                logger.warning("[GenericWorker] ⚠️ task_failed 账本写入提交失败: %s", event_err)
 
         # ✅ 合并 started 事件和 failed 事件（不可变）
-        full_event_queue = append_sse_event(initial_event_queue, sse_event_to_string(failed_event))
+        full_event_queue = append_sse_events(
+            base_event_queue, [started_event_str, sse_event_to_string(failed_event)]
+        )
 
         return {
             "task_list": failed_task_list,
@@ -779,8 +874,8 @@ async def generic_worker_node(
             "output_result": f"专家执行失败: {str(e)}",
             "status": "failed",
             "error": str(e),
-            "started_at": started_at.isoformat(),
-            "completed_at": datetime.now().isoformat(),
+            "started_at": started_iso,
+            "completed_at": failed_at.isoformat(),
             "event_queue": full_event_queue,  # ✅ 添加完整事件队列（包含 started 和 failed）
             # ✅ 添加 __expert_info 用于标识失败的专家
             "__expert_info": {
@@ -795,19 +890,34 @@ async def generic_worker_node(
         }
 
 
+def _early_failure_result(output_result: str, error: str) -> dict[str, Any]:
+    """执行前失败（无任务/缺字段/专家不存在）的返回值，起止时间共用一次取值"""
+    now_iso = datetime.now().isoformat()
+    return {
+        "output_result": output_result,
+        "status": "failed",
+        "error": error,
+        "started_at": now_iso,
+        "completed_at": now_iso,
+    }
+
+
 def _format_input_data(data: dict) -> str:
-    """格式化输入数据为文本"""
+    """格式化输入数据为文本（键排序、嵌套值稳定序列化，相同参数得到逐字节一致的提示词）"""
     if not data:
         return "（无额外参数）"
 
-    lines = []
-    for key, value in data.items():
-        if isinstance(value, list | dict):
-            lines.append(f"- {key}: {value}")
-        else:
-            lines.append(f"- {key}: {value}")
+    return "\n".join(
+        f"- {key}: {_format_input_value(value)}"
+        for key, value in sorted(data.items(), key=lambda item: str(item[0]))
+    )
+
 
-    return "\n".join(lines)
+def _format_input_value(value: Any) -> str:
+    """嵌套 dict / list 使用排序键 JSON，避免插入顺序不同导致提示词变化"""
+    if isinstance(value, dict | list):
+        return json.dumps(value, ensure_ascii=False, sort_keys=True, default=str)
+    return str(value)
 
 
 def _detect_artifact_type(content: str, expert_key: str) -> str:
@@ -816,26 +926,21 @@ def _detect_artifact_type(content: str, expert_key: str) -> str:
 
     简化版，默认返回 "text"，但会尝试检测 HTML 和 Markdown 内容。
     """
-    content_lower = content.lower().strip()
-
-    # 1. HTML 检测
-    if (
-        content_lower.startswith("<!doctype html")
-        or content_lower.startswith("<html")
-        or ("<html" in content_lower and "</html>" in content_lower)
-    ):
-        return "html"
-
-    # 检测 HTML 代码块
-    html_code_block = re.search(r"```html\n([\s\S]*?)```", content, re.IGNORECASE)
-    if html_code_block:
+    # 1. HTML 检测：文档开头 / 成对 <html> 标签 / 闭合的 ```html 代码块
+    if _HTML_DOC_START_RE.match(content):
         return "html"
-
-    # 2. Markdown 检测
-    has_markdown = any(marker in content for marker in ["# ", "## ", "### ", "> ", "- ", "* "])
-    has_code_block = "```" in content
-
-    if has_markdown or has_code_block:
+    has_close_tag = None
+    for marker in _HTML_MARKER_RE.finditer(content):
+        if marker.group(1):
+            if has_close_tag is None:
+                has_close_tag = _HTML_CLOSE_TAG_RE.search(content) is not None
+            if has_close_tag:
+                return "html"
+        elif content.find("```", marker.end()) != -1:
+            return "html"
+
+    # 2. Markdown 检测（标记或代码块）
+    if _MARKDOWN_MARKER_RE.search(content):
         return "markdown"
 
     # 3. 默认返回 text
@@ -7,23 +7,48 @@ v3.5 更新：使用数据库配置 + 占位符动态填充
 v3.6 更新：使用 prompt_utils.inject_current_time 替代内联实现
 """
 
+import asyncio
+import hashlib
+import math
+import os
 import re
+from collections.abc import Sequence
 from datetime import datetime
 from typing import Any, Literal
 
-from langchain_core.messages import SystemMessage
+from cachetools import TTLCache
+from langchain_core.messages import BaseMessage, SystemMessage
+from langchain_core.messages.utils import count_tokens_approximately, trim_messages
 from langchain_core.output_parsers import PydanticOutputParser
 from langchain_core.runnables import RunnableConfig
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, ValidationError
 
 from agents.services.expert_manager import get_expert_config_cached
 from agents.state import AgentState
 from agents.state_patch import append_sse_event, get_event_queue_snapshot
+from config import settings
 from constants import DEFAULT_ASSISTANT_PROMPT, ROUTER_SYSTEM_PROMPT
-from services.memory_manager import memory_manager  # 🔥 导入记忆管理器
+from services.memory_manager import get_cached_embedding, memory_manager  # 🔥 导入记忆管理器
 from utils.event_generator import event_router_decision, event_router_start, sse_event_to_string
 from utils.logger import logger
-from utils.prompt_utils import inject_current_time  # v3.6: 提取到工具函数
+from utils.prompt_utils import format_current_time, inject_current_time  # v3.6: 提取到工具函数
+
+# 路由决策缓存: 摘要(Prompt 模板 + 相关记忆 + 对话消息) -> decision_type (1小时TTL)
+# 仅精确命中；由 ENABLE_ROUTER_CACHE 开关控制，默认关闭
+_router_decision_cache: TTLCache = TTLCache(maxsize=5000, ttl=3600)
+
+# 语义路由缓存: user_id -> [(单位化查询向量, decision_type), ...] (1小时TTL)
+# 仅用于新会话的首条消息（决策只取决于这一句话），精确缓存未命中时按余弦相似度复用
+_router_semantic_cache: TTLCache = TTLCache(maxsize=1000, ttl=3600)
+_ROUTER_SEMANTIC_THRESHOLD = float(os.getenv("ROUTER_SEMANTIC_CACHE_THRESHOLD", "0.97"))
+_ROUTER_SEMANTIC_MAX_ENTRIES = 64
+
+# 发给路由 LLM 的对话历史 token 预算（近似计数）：分类只看最新输入，超出时只保留最近的回合
+_ROUTER_HISTORY_TOKEN_BUDGET = int(os.getenv("ROUTER_HISTORY_MAX_TOKENS", "2000"))
+
+# 占位符匹配（模块级预编译）：一次扫描同时完成替换与未填充检测
+_PLACEHOLDER_RE = re.compile(r"\{([a-zA-Z_][a-zA-Z0-9_]*)\}")
+_WHITESPACE_RE = re.compile(r"\s+")
 
 
 class RoutingDecision(BaseModel):
@@ -32,6 +57,14 @@ class RoutingDecision(BaseModel):
     decision_type: Literal["simple", "complex"] = Field(description="决策类型")
 
 
+# 降级解析器（模块级复用）：仅在原生 JSON 校验失败时处理 Markdown 代码块等包裹格式
+_ROUTING_PARSER = PydanticOutputParser(pydantic_object=RoutingDecision)
+
+# 结构化输出 Runnable 缓存: id(llm) -> (llm, runnable)
+# runnable 为 None 表示该模型不支持 response_format，后续请求直接走降级路径
+_structured_router_cache: dict[int, tuple[Any, Any]] = {}
+
+
 async def router_node(state: AgentState, config: RunnableConfig = None) -> dict[str, Any]:
     """
     [网关] 只负责分类，不负责回答
@@ -57,13 +90,13 @@ async def router_node(state: AgentState, config: RunnableConfig = None) -> dict[
     # 后续可以从请求 header 或上下文传递 user_id
     user_id = state.get("user_id", "default_user")
 
-    logger.info(f"--- [Router] 正在思考: {user_query[:100]}... ---")
+    logger.info("--- [Router] 正在思考: %.100s... ---", user_query)
 
     # 🔥 Phase 3: 初始化事件队列，发送 router.start 事件（不可变更新）
     base_event_queue = get_event_queue_snapshot(state)
     start_event = event_router_start(query=user_query[:200])  # 限制长度
     event_queue = append_sse_event(base_event_queue, sse_event_to_string(start_event))
-    logger.info("[Router] 已发送 router.start 事件")
+    logger.debug("[Router] 已发送 router.start 事件")
 
     # 0. 确定性兜底：某些任务必须进入 complex，避免路由模型误判。
     forced_complex_reason = _get_forced_complex_reason(user_query)
@@ -79,72 +112,105 @@ async def router_node(state: AgentState, config: RunnableConfig = None) -> dict[
             "event_queue": full_event_queue,
         }
 
-    # 1. 🔥 检索长期记忆（异步）
-    try:
-        relevant_memories = await memory_manager.search_relevant_memories(
-            user_id, user_query, limit=3
-        )
-    except Exception as e:
-        logger.warning(f"[Router] 记忆检索失败: {e}")
-        relevant_memories = ""
-
-    # 2. 🔥 v3.5: 加载 System Prompt（DB -> Cache -> Constants 兜底）
+    # 1. 🔥 先在后台启动长期记忆检索，再加载 System Prompt（Cache -> Constants 兜底）
+    # Prompt 只读进程内缓存（不查库），直接在事件循环中调用，无需线程池往返
+    memory_task = asyncio.ensure_future(
+        memory_manager.search_relevant_memories(user_id, user_query, limit=3)
+    )
     system_prompt = _load_router_system_prompt()
 
+    # Prompt 模板不引用记忆时（如 L3 静态兜底）不等待检索，记忆往返完全移出关键路径
+    memories_needed = "{relevant_memories}" in system_prompt
+    relevant_memories = await _collect_router_memories(memory_task, needed=memories_needed)
+
+    # 2.0 裁剪发给路由 LLM 的历史（长会话只保留最近回合，减少输入 token）
+    history = _trim_router_history(messages)
+
+    # 2.1 路由决策缓存：相同 Prompt 模板 + 记忆 + 对话内容直接复用上次判定，跳过 LLM 调用
+    # 时间占位符不参与缓存键（分类结果与秒级时间无关）
+    cache_key = None
+    query_vector = None
+    if settings.enable_router_cache:
+        cache_key = _router_cache_key(system_prompt, relevant_memories, history)
+        cached_decision = _router_decision_cache.get(cache_key)
+        if not cached_decision and memories_needed and len(messages) == 1:
+            # 语义缓存：只读取记忆检索刚写入嵌入缓存的查询向量，不额外发起嵌入请求；
+            # 记忆检索未执行或嵌入失败时向量为空，静默视为未命中
+            query_vector = _normalize_vector(
+                await asyncio.to_thread(get_cached_embedding, user_query)
+            )
+            cached_decision = _lookup_semantic_decision(user_id, query_vector)
+        if cached_decision:
+            decision_event = event_router_decision(
+                decision=cached_decision, reason="cached_router_decision"
+            )
+            full_event_queue = append_sse_event(event_queue, sse_event_to_string(decision_event))
+            logger.info("[Router] 路由决策缓存命中: %s", cached_decision)
+            return {
+                "router_decision": cached_decision,
+                "event_queue": full_event_queue,
+            }
+
     # 3. 🔥 v3.5: 填充占位符
     system_prompt = _fill_router_placeholders(
         system_prompt=system_prompt, user_query=user_query, relevant_memories=relevant_memories
     )
-    logger.info("[Router] System Prompt 已加载并填充占位符")
+    logger.debug("[Router] System Prompt 已加载并填充占位符")
 
-    parser = PydanticOutputParser(pydantic_object=RoutingDecision)
     try:
         # 🔥 v3.7: 智能模式选择 - 先尝试 with_structured_output，不支持则降级
         from agents.graph import get_router_llm_lazy
 
         llm = get_router_llm_lazy()
+        llm_messages = [SystemMessage(content=system_prompt), *history]
+        llm_config = {"tags": ["router"], "metadata": {"node_type": "router"}}
+        decision_type = None
 
         # 尝试使用原生结构化输出（OpenAI, Kimi 等支持）
-        try:
-            llm_structured = llm.with_structured_output(RoutingDecision)
-            decision = await llm_structured.ainvoke(
-                [SystemMessage(content=system_prompt), *messages],
-                config={"tags": ["router"], "metadata": {"node_type": "router"}},
-            )
-            # 健壮性处理：支持 Pydantic 对象或字典返回
-            if isinstance(decision, dict):
-                decision_type = decision.get("decision_type", "complex")
-            else:
-                decision_type = decision.decision_type
-            logger.info(f"[Router] 使用结构化输出，决策结果: {decision_type}")
-        except Exception as structured_error:
-            # 模型不支持 structured_output（如 DeepSeek），降级到 PydanticOutputParser
-            if "response_format" in str(structured_error).lower() or "400" in str(structured_error):
-                logger.warning("[Router] 模型不支持结构化输出，降级到 PydanticOutputParser")
-                response = await llm.ainvoke(
-                    [SystemMessage(content=system_prompt), *messages],
-                    config={"tags": ["router"], "metadata": {"node_type": "router"}},
-                )
-                decision = parser.parse(response.content)
-                decision_type = decision.decision_type
-                logger.info(f"[Router] 使用 PydanticOutputParser，决策结果: {decision_type}")
-            else:
-                # 其他错误，继续抛出
-                raise
+        llm_structured = _get_structured_router(llm)
+        if llm_structured is not None:
+            try:
+                decision = await llm_structured.ainvoke(llm_messages, config=llm_config)
+                # 健壮性处理：支持 Pydantic 对象或字典返回
+                if isinstance(decision, dict):
+                    decision_type = decision.get("decision_type", "complex")
+                else:
+                    decision_type = decision.decision_type
+                logger.debug("[Router] 使用结构化输出，决策结果: %s", decision_type)
+            except Exception as structured_error:
+                # 模型不支持 structured_output（如 DeepSeek），降级到 JSON 文本解析
+                error_text = str(structured_error).lower()
+                if "response_format" in error_text:
+                    # 明确不支持：记住结果，避免之后每次请求都多一次失败的往返
+                    _structured_router_cache[id(llm)] = (llm, None)
+                elif "400" not in error_text:
+                    # 其他错误，继续抛出
+                    raise
+                logger.warning("[Router] 模型不支持结构化输出，降级到 JSON 文本解析")
+
+        if decision_type is None:
+            response = await llm.ainvoke(llm_messages, config=llm_config)
+            decision_type = _parse_routing_decision(response.content).decision_type
+            logger.debug("[Router] 使用 JSON 文本解析，决策结果: %s", decision_type)
+
+        if cache_key is not None:
+            _router_decision_cache[cache_key] = decision_type
+        if query_vector is not None:
+            _remember_semantic_decision(user_id, query_vector, decision_type)
 
         # 🔥 Phase 3: 发送 router.decision 事件
         decision_event = event_router_decision(
             decision=decision_type, reason="Based on query complexity analysis"
         )
         full_event_queue = append_sse_event(event_queue, sse_event_to_string(decision_event))
-        logger.info(f"[Router] 已发送 router.decision 事件: {decision_type}")
+        logger.info("[Router] 已发送 router.decision 事件: %s", decision_type)
 
         return {
             "router_decision": decision_type,
             "event_queue": full_event_queue,  # 返回事件队列
         }
     except Exception as e:
-        logger.error(f"[ROUTER ERROR] {e}")
+        logger.error("[ROUTER ERROR] %s", e)
 
         # 🔥 Phase 3: 错误时也发送 decision 事件（fallback 到 complex）
         decision_event = event_router_decision(
@@ -156,28 +222,126 @@ async def router_node(state: AgentState, config: RunnableConfig = None) -> dict[
         return {"router_decision": "complex", "event_queue": full_event_queue}
 
 
+async def _collect_router_memories(memory_task: asyncio.Future, needed: bool) -> str:
+    """取回并发启动的记忆检索结果；模板用不到记忆时直接取消，失败时降级为空字符串"""
+    if not needed:
+        memory_task.cancel()
+        # 已完成（含失败）的任务无法取消，取出异常避免 "exception was never retrieved" 告警
+        if memory_task.done() and not memory_task.cancelled():
+            memory_task.exception()
+        return ""
+
+    try:
+        return await memory_task
+    except Exception as e:
+        logger.warning("[Router] 记忆检索失败: %s", e)
+        return ""
+
+
 def _load_router_system_prompt() -> str:
     """
     v3.5: 三层兜底加载 Router System Prompt
 
-    L1: SystemExpert 数据库表
-    L2: 内存缓存
+    L1: SystemExpert 数据库表（启动时由 preload_all_experts 预热进缓存）
+    L2: 内存缓存（只读，不回源查库，可直接在事件循环中调用）
     L3: constants.ROUTER_SYSTEM_PROMPT (静态兜底)
     """
     # L1/L2: 尝试从数据库/缓存加载
     try:
         config = get_expert_config_cached("router")
         if config and config.get("system_prompt"):
-            logger.info("[Router] 从数据库/缓存加载 System Prompt")
+            logger.debug("[Router] 从数据库/缓存加载 System Prompt")
             return config["system_prompt"]
     except Exception as e:
-        logger.warning(f"[Router] 从数据库加载失败: {e}")
+        logger.warning("[Router] 从数据库加载失败: %s", e)
 
     # L3: 兜底到静态常量
     logger.info("[Router] 使用静态常量 System Prompt (L3兜底)")
     return ROUTER_SYSTEM_PROMPT
 
 
+def _get_structured_router(llm) -> Any:
+    """按 LLM 实例缓存 with_structured_output 结果（Schema 转换只做一次）；不支持时返回 None"""
+    cached = _structured_router_cache.get(id(llm))
+    if cached is not None and cached[0] is llm:
+        return cached[1]
+
+    structured = llm.with_structured_output(RoutingDecision)
+    _structured_router_cache[id(llm)] = (llm, structured)
+    return structured
+
+
+def _parse_routing_decision(content: str) -> RoutingDecision:
+    """解析降级路径的文本响应：优先 pydantic-core 直接校验 JSON，失败再走 PydanticOutputParser"""
+    try:
+        return RoutingDecision.model_validate_json(content)
+    except ValidationError:
+        return _ROUTING_PARSER.parse(content)
+
+
+def _trim_router_history(messages: list[BaseMessage]) -> list[BaseMessage]:
+    """按 token 预算裁剪路由用的对话历史（从 HumanMessage 开始）；预算不足时只保留最新一条消息"""
+    if count_tokens_approximately(messages) <= _ROUTER_HISTORY_TOKEN_BUDGET:
+        return messages
+
+    trimmed = trim_messages(
+        messages,
+        max_tokens=_ROUTER_HISTORY_TOKEN_BUDGET,
+        token_counter=count_tokens_approximately,
+        strategy="last",
+        start_on="human",
+        allow_partial=False,
+    )
+    return trimmed or messages[-1:]
+
+
+def _router_cache_key(
+    system_prompt: str, relevant_memories: str, messages: Sequence[BaseMessage]
+) -> str:
+    """计算路由决策缓存键（Prompt 模板、记忆、每条消息的类型与内容逐段哈希）"""
+    digest = hashlib.sha256()
+    for part in (system_prompt, relevant_memories or ""):
+        digest.update(part.encode())
+        digest.update(b"\x00")
+    for message in messages:
+        digest.update(getattr(message, "type", "").encode())
+        digest.update(b"\x00")
+        digest.update(str(getattr(message, "content", message)).encode())
+        digest.update(b"\x00")
+    return digest.hexdigest()
+
+
+def _normalize_vector(vector: list[float]) -> tuple[float, ...] | None:
+    """转为单位向量（点积即余弦相似度）；空向量或零向量返回 None"""
+    if not vector:
+        return None
+    norm = math.hypot(*vector)
+    return tuple(value / norm for value in vector) if norm else None
+
+
+def _lookup_semantic_decision(user_id: str, query_vector: tuple[float, ...] | None) -> str | None:
+    """在该用户近期的首条消息中查找语义最相近的路由决策（相似度需达到阈值）"""
+    entries = _router_semantic_cache.get(user_id)
+    if query_vector is None or not entries:
+        return None
+
+    best_score, best_decision = max(
+        ((math.sumprod(vector, query_vector), decision) for vector, decision in entries),
+        key=lambda item: item[0],
+    )
+    return best_decision if best_score >= _ROUTER_SEMANTIC_THRESHOLD else None
+
+
+def _remember_semantic_decision(
+    user_id: str, query_vector: tuple[float, ...], decision: str
+) -> None:
+    """记录首条消息的路由决策（不可变追加，每个用户只保留最近的若干条）"""
+    entries = _router_semantic_cache.get(user_id, ())
+    _router_semantic_cache[user_id] = (*entries, (query_vector, decision))[
+        -_ROUTER_SEMANTIC_MAX_ENTRIES:
+    ]
+
+
 def _fill_router_placeholders(system_prompt: str, user_query: str, relevant_memories: str) -> str:
     """
     v3.5: 填充 Router System Prompt 中的占位符
@@ -187,11 +351,8 @@ def _fill_router_placeholders(system_prompt: str, user_query: str, relevant_memo
     - {current_time}: 当前时间
     - {relevant_memories}: 相关记忆
     """
-    # 准备时间信息
-    now = datetime.now()
-    weekdays = ["星期一", "星期二", "星期三", "星期四", "星期五", "星期六", "星期日"]
-    weekday_str = weekdays[now.weekday()]
-    time_str = now.strftime(f"%Y年%m月%d日 %H:%M:%S {weekday_str}")
+    # 准备时间信息（与 inject_current_time 共用同一格式化函数）
+    time_str = format_current_time(datetime.now())
 
     # 构建占位符映射
     placeholder_map = {
@@ -200,26 +361,33 @@ def _fill_router_placeholders(system_prompt: str, user_query: str, relevant_memo
         "relevant_memories": relevant_memories if relevant_memories else "（暂无记忆）",
     }
 
-    # 替换所有支持的占位符
-    for placeholder, value in placeholder_map.items():
-        placeholder_pattern = f"{{{placeholder}}}"
-        if placeholder_pattern in system_prompt:
-            system_prompt = system_prompt.replace(placeholder_pattern, value)
-            logger.info(f"[Router] 已注入占位符: {{{placeholder}}}")
+    # 单次扫描替换所有支持的占位符；注入的值不会被再次解析（用户输入中的 {xxx} 原样保留）
+    filled_placeholders: list[str] = []
+    remaining_placeholders: list[str] = []
 
-    # 检查是否还有未填充的占位符（警告但不中断）
-    import re
+    def _replace(match: re.Match) -> str:
+        placeholder = match.group(1)
+        value = placeholder_map.get(placeholder)
+        if value is None:
+            remaining_placeholders.append(placeholder)
+            return match.group(0)
+        filled_placeholders.append(placeholder)
+        return value
 
-    remaining_placeholders = re.findall(r"\{([a-zA-Z_][a-zA-Z0-9_]*)\}", system_prompt)
+    system_prompt = _PLACEHOLDER_RE.sub(_replace, system_prompt)
+    if filled_placeholders:
+        logger.debug("[Router] 已注入占位符: %s", filled_placeholders)
+
+    # 检查是否还有未填充的占位符（警告但不中断）
     if remaining_placeholders:
-        logger.warning(f"[Router] 警告: 以下占位符未填充: {remaining_placeholders}")
+        logger.warning("[Router] 警告: 以下占位符未填充: %s", remaining_placeholders)
 
     return system_prompt
 
 
 def _get_forced_complex_reason(user_query: str) -> str | None:
     """对高风险误判场景进行确定性复杂模式兜底。"""
-    normalized_query = re.sub(r"\s+", "", user_query.lower())
+    normalized_query = _WHITESPACE_RE.sub("", user_query.lower())
 
     direct_complex_keywords = (
         "记住",
@@ -268,7 +436,7 @@ async def direct_reply_node(state: AgentState, config: RunnableConfig = None) ->
 
     🔥 新增：集成长期记忆，提供个性化回复
     """
-    logger.info("[DIRECT_REPLY] 节点开始执行")
+    logger.debug("[DIRECT_REPLY] 节点开始执行")
     messages = state["messages"]
     last_message = messages[-1]
     user_query = last_message.content if hasattr(last_message, "content") else str(last_message)
@@ -282,13 +450,13 @@ async def direct_reply_node(state: AgentState, config: RunnableConfig = None) ->
             user_id, user_query, limit=5
         )
     except Exception as e:
-        logger.warning(f"[DirectReply] 记忆检索失败: {e}")
+        logger.warning("[DirectReply] 记忆检索失败: %s", e)
         relevant_memories = ""
 
     # 2. 🔥 构建 System Prompt（注入记忆和时间）
     system_prompt = DEFAULT_ASSISTANT_PROMPT
     if relevant_memories:
-        logger.info(f"[DirectReply] 激活记忆:\n{relevant_memories}")
+        logger.debug("[DirectReply] 激活记忆:\n%s", relevant_memories)
         system_prompt += f"""
 
 【关于该用户的已知信息】:
@@ -297,7 +465,7 @@ async def direct_reply_node(state: AgentState, config: RunnableConfig = None) ->
 
     # 🔥 核心修改：注入当前时间
     system_prompt = inject_current_time(system_prompt)
-    logger.info("[DirectReply] 已注入当前时间到 System Prompt")
+    logger.debug("[DirectReply] 已注入当前时间到 System Prompt")
 
     # 使用流式配置，添加 metadata 便于追踪
     config = {"tags": ["direct_reply"], "metadata": {"node_type": "direct_reply"}}
@@ -313,7 +481,7 @@ async def direct_reply_node(state: AgentState, config: RunnableConfig = None) ->
         config=config,
     )
 
-    logger.info(f"[DIRECT_REPLY] 节点完成，回复长度: {len(response.content)}")
+    logger.info("[DIRECT_REPLY] 节点完成，回复长度: %s", len(response.content))
 
     # 直接返回 response 对象（保留完整元数据），并添加 final_response 字段
     return {"messages": [response], "final_response": response.content}
@@ -7,18 +7,38 @@
 P1 优化: 使用 cachetools.TTLCache 替代自定义缓存
 """
 
+import asyncio
+import os
+import threading
+
 from cachetools import TTLCache
 from sqlmodel import Session, select
 
+from database import engine
 from models import SystemExpert
+from providers_config import get_model_config
 from utils.llm_factory import get_effective_model
 from utils.logger import logger
 
-# P1 优化: 使用 TTLCache 替代自定义缓存 + 锁
+# P1 优化: 使用 TTLCache 替代自定义缓存
 # - 自动 TTL 过期 (5分钟)
-# - 线程安全 (内部已加锁)
 # - 无需手动管理 timestamp
-_expert_cache: TTLCache = TTLCache(maxsize=100, ttl=300)
+# - 每次只做一次 .get()（不做 in + [] 两步，避免两步之间条目过期抛 KeyError）
+# 事件循环与线程池（预热 / 定时刷新 / 节点回源）会同时读写，TTLCache 本身非线程安全，读写需加锁
+_expert_cache: TTLCache = TTLCache(maxsize=512, ttl=300)
+_expert_cache_lock = threading.Lock()
+
+# 定时刷新间隔（秒）：短于缓存 TTL，保证预热后的缓存在进程生命周期内持续有效
+EXPERT_CACHE_REFRESH_SECONDS = int(os.getenv("EXPERT_CACHE_REFRESH_SECONDS", "240"))
+
+# 模型名前缀 -> provider（providers.yaml 未登记该模型时的启发式兜底）
+_PROVIDER_PREFIXES: tuple[tuple[str, str], ...] = (
+    ("minimax", "minimax"),
+    ("deepseek", "deepseek"),
+    ("gpt", "openai"),
+    ("kimi", "moonshot"),
+    ("claude", "anthropic"),
+)
 
 
 def get_expert_config(expert_key: str, session: Session) -> dict | None:
@@ -47,50 +67,48 @@ def get_expert_config(expert_key: str, session: Session) -> dict | None:
     return _build_config(expert)
 
 
-def _build_config(expert: SystemExpert) -> dict:
-    """构建专家配置（提取公共逻辑）"""
-    # 应用模型兜底机制
-    effective_model = get_effective_model(expert.model)
+def _build_config(
+    expert: SystemExpert, resolved_models: dict[str | None, tuple[str, str | None]] | None = None
+) -> dict:
+    """
+    构建专家配置（提取公共逻辑）
 
-    config = {
+    Args:
+        expert: 专家记录
+        resolved_models: 批量构建时共享的 {配置模型: (有效模型, provider)} 映射，
+            多个专家使用同一模型时只解析一次
+    """
+    resolved = resolved_models.get(expert.model) if resolved_models is not None else None
+    if resolved is None:
+        # 应用模型兜底机制 + 推断 provider
+        effective_model = get_effective_model(expert.model)
+        resolved = (effective_model, _infer_provider(effective_model))
+        if resolved_models is not None:
+            resolved_models[expert.model] = resolved
+
+    effective_model, provider = resolved
+    return {
         "expert_key": expert.expert_key,
         "name": expert.name,
         "system_prompt": expert.system_prompt,
         "model": effective_model,
         "temperature": expert.temperature,
+        "provider": provider,
     }
 
-    # 推断 provider
-    config["provider"] = _infer_provider(effective_model)
-
-    return config
-
 
 def _infer_provider(model: str) -> str | None:
-    """从模型名称推断 provider"""
-    try:
-        from providers_config import get_model_config
-
-        model_config = get_model_config(model)
-        if model_config and "provider" in model_config:
-            return model_config["provider"]
-    except ImportError:
-        pass
+    """从模型名称推断 provider（get_model_config 自带 lru_cache，reload_config 时一并失效）"""
+    model_config = get_model_config(model)
+    if model_config and "provider" in model_config:
+        return model_config["provider"]
 
     # 启发式推断
     model_lower = model.lower()
-    if model_lower.startswith("minimax"):
-        return "minimax"
-    elif model_lower.startswith("deepseek"):
-        return "deepseek"
-    elif model_lower.startswith("gpt"):
-        return "openai"
-    elif model_lower.startswith("kimi"):
-        return "moonshot"
-    elif model_lower.startswith("claude"):
-        return "anthropic"
-
-    return None
+    return next(
+        (provider for prefix, provider in _PROVIDER_PREFIXES if model_lower.startswith(prefix)),
+        None,
+    )
 
 
 def get_expert_prompt(expert_key: str, session: Session) -> str | None:
@@ -119,7 +137,8 @@ def load_all_experts(session: Session) -> dict[str, dict]:
         Dict: 所有专家配置 {expert_key: config}
     """
     experts = session.exec(select(SystemExpert)).all()
-    return {expert.expert_key: _build_config(expert) for expert in experts}
+    resolved_models: dict[str | None, tuple[str, str | None]] = {}
+    return {expert.expert_key: _build_config(expert, resolved_models) for expert in experts}
 
 
 def get_expert_prompt_cached(expert_key: str, session: Session | None = None) -> str | None:
@@ -128,7 +147,7 @@ def get_expert_prompt_cached(expert_key: str, session: Session | None = None) ->
 
     缓存策略：
     - TTL 自动过期（5分钟）
-    - 线程安全（cachetools 内部已加锁）
+    - 命中时只做一次加锁 .get()
 
     Args:
         expert_key: 专家类型标识
@@ -137,19 +156,10 @@ def get_expert_prompt_cached(expert_key: str, session: Session | None = None) ->
     Returns:
         str: 专家系统提示词
     """
-    # 尝试从缓存读取
-    if expert_key in _expert_cache:
-        config = _expert_cache[expert_key]
+    config = get_expert_config_cached(expert_key, session)
+    if config:
         return config.get("system_prompt")
 
-    # 缓存未命中，加载所有专家
-    if session:
-        experts = load_all_experts(session)
-        _expert_cache.update(experts)
-        config = _expert_cache.get(expert_key)
-        if config:
-            return config.get("system_prompt")
-
     logger.warning(f"[ExpertManager] Expert '{expert_key}' not found in cache")
     return None
 
@@ -166,14 +176,17 @@ def get_expert_config_cached(expert_key: str, session: Session | None = None) ->
         Dict: 专家完整配置
     """
     # 尝试从缓存读取
-    if expert_key in _expert_cache:
-        return _expert_cache[expert_key]
+    with _expert_cache_lock:
+        config = _expert_cache.get(expert_key)
+    if config is not None:
+        return config
 
-    # 缓存未命中，加载所有专家
+    # 缓存未命中，加载所有专家（查库在锁外进行）
     if session:
         experts = load_all_experts(session)
-        _expert_cache.update(experts)
-        return _expert_cache.get(expert_key)
+        with _expert_cache_lock:
+            _expert_cache.update(experts)
+        return experts.get(expert_key)
 
     return None
 
@@ -189,7 +202,8 @@ def refresh_cache(session: Session | None = None):
         session: 数据库会话（可选）
     """
     # 1. 清除全局缓存
-    _expert_cache.clear()
+    with _expert_cache_lock:
+        _expert_cache.clear()
     logger.info("[ExpertManager] 全局缓存已清除")
 
     # 2. 清除各模块本地缓存（避免多实例/多模块间缓存不一致）
@@ -210,23 +224,67 @@ def refresh_cache(session: Session | None = None):
             generic._generic_expert_cache.clear()
             logger.info("[ExpertManager] GenericWorker 缓存已清除")
 
+        # Generic Worker 负缓存（新建专家后需立即可见）
+        if hasattr(generic, "_missing_expert_cache"):
+            generic._missing_expert_cache.clear()
+            logger.info("[ExpertManager] GenericWorker 负缓存已清除")
+
     except ImportError as e:
         logger.warning(f"[ExpertManager] 清除本地缓存时部分模块未找到: {e}")
 
     # 3. 重新加载到全局缓存（如果提供了 session）
     if session:
         experts = load_all_experts(session)
-        _expert_cache.update(experts)
+        with _expert_cache_lock:
+            _expert_cache.update(experts)
         logger.info(f"[ExpertManager] 已重新加载 {len(experts)} 个专家到缓存")
 
 
+def preload_all_experts(session: Session) -> int:
+    """
+    启动预热：一次 SELECT 加载全部专家配置到全局缓存
+
+    替代启动时单纯清空缓存，首批请求直接命中缓存，不再逐个专家回源查库。
+    缓存 TTL 为 5 分钟，之后由 run_expert_cache_refresh_loop 定时重新预热。
+
+    Args:
+        session: 数据库会话
+
+    Returns:
+        int: 预热的专家数量
+    """
+    experts = load_all_experts(session)
+    with _expert_cache_lock:
+        _expert_cache.clear()
+        _expert_cache.update(experts)
+    return len(experts)
+
+
+def preload_all_experts_from_db() -> int:
+    """同步预热（在线程池中执行）：自行打开数据库会话"""
+    with Session(engine) as session:
+        return preload_all_experts(session)
+
+
+async def run_expert_cache_refresh_loop() -> None:
+    """后台定时重新预热专家缓存，避免 TTL 到期后首个请求同步回源查库"""
+    while True:
+        await asyncio.sleep(EXPERT_CACHE_REFRESH_SECONDS)
+        try:
+            expert_count = await asyncio.to_thread(preload_all_experts_from_db)
+            logger.debug("[ExpertManager] 专家缓存已定时刷新: %s 个专家", expert_count)
+        except Exception as exc:
+            logger.warning("[ExpertManager] 专家缓存定时刷新失败: %s", exc)
+
+
 def force_refresh_all():
     """
     强制刷新所有专家配置
 
     用于 API 调用后立即刷新缓存
     """
-    _expert_cache.clear()
+    with _expert_cache_lock:
+        _expert_cache.clear()
 
 
 def get_all_expert_list(db_session: Session | None = None) -> list[tuple]:
@@ -53,8 +53,10 @@ def replace_task_item(
     if index < 0 or index >= len(task_list):
         raise IndexError(f"Task index out of range: {index}")
 
-    updated_task = {
+    # 浅拷贝列表 + 只复制被修改的任务项，其余任务项与原列表共享引用
+    updated_task_list = list(task_list)
+    updated_task_list[index] = {
         **task_list[index],
         **patch,
     }
-    return [*task_list[:index], updated_task, *task_list[index + 1 :]]
+    return updated_task_list
@@ -9,6 +9,7 @@
 
 from __future__ import annotations
 
+from collections.abc import Sequence
 from dataclasses import dataclass
 from enum import StrEnum
 from typing import Any
@@ -263,7 +264,7 @@ def evaluate_tool_policy(
 
 
 def filter_tools_for_binding(
-    tools: list[Any],
+    tools: Sequence[Any],
     *,
     expert_type: str | None = None,
     overrides: dict[tuple[str, str], ToolPolicyOverride] | None = None,
@@ -8,6 +8,7 @@ import logging
 from typing import Any
 
 import httpx
+from cachetools import TTLCache
 from langchain_core.messages import ToolMessage
 from langchain_core.runnables import RunnableConfig
 from langgraph.prebuilt import ToolNode
@@ -32,6 +33,30 @@ MAX_RETRIES = 2
 # 重试延迟（指数退避）
 RETRY_DELAYS = [1.0, 2.0]
 
+# ============================================================================
+# 执行器缓存
+# ============================================================================
+
+# 内置工具名集合（模块加载时计算一次）
+_BUILTIN_TOOL_NAMES = frozenset(get_tool_name(tool) for tool in BASE_TOOLS)
+
+# ToolNode 缓存: 工具集 -> (工具元组, ToolNode)
+# ToolNode 内部已用 asyncio.gather 并发执行同一条 AIMessage 的多个 tool_calls，
+# 这里只避免每次工具轮次都重新构建执行器与工具索引
+_tool_executor_cache: TTLCache = TTLCache(maxsize=32, ttl=300)
+
+
+def _get_tool_executor(runtime_tools: list[Any]) -> ToolNode:
+    """按工具集缓存 ToolNode（值持有工具强引用，命中时再校验身份）"""
+    key = tuple(id(tool) for tool in runtime_tools)
+    cached = _tool_executor_cache.get(key)
+    if cached is not None and all(a is b for a, b in zip(cached[0], runtime_tools, strict=True)):
+        return cached[1]
+
+    executor = ToolNode(runtime_tools)
+    _tool_executor_cache[key] = (tuple(runtime_tools), executor)
+    return executor
+
 
 # ============================================================================
 # 错误分类
@@ -160,7 +185,6 @@ async def dynamic_tool_node(
         mcp_tools = config.get("configurable", {}).get("mcp_tools", [])
 
     runtime_tools = list(BASE_TOOLS) + list(mcp_tools)
-    builtin_tool_names = {get_tool_name(tool) for tool in BASE_TOOLS}
     tool_name_to_tool = {get_tool_name(tool): tool for tool in runtime_tools}
 
     # 如果有 MCP 工具，使用更长的超时
@@ -202,7 +226,7 @@ async def dynamic_tool_node(
     for tc in tool_calls:
         tool_name = tc.get("name", "unknown")
         tool = tool_name_to_tool.get(tool_name)
-        source = "builtin" if tool_name in builtin_tool_names else "mcp"
+        source = "builtin" if tool_name in _BUILTIN_TOOL_NAMES else "mcp"
         description = getattr(tool, "description", None) if tool is not None else None
         decision = evaluate_tool_policy(
             tool_name=tool_name,
@@ -234,7 +258,7 @@ async def dynamic_tool_node(
             ]
         }
 
-    tool_executor = ToolNode(runtime_tools)
+    tool_executor = _get_tool_executor(runtime_tools)
 
     # 执行工具调用（带重试）
     for attempt in range(1, MAX_RETRIES + 1):
@@ -79,6 +79,7 @@ class Settings(BaseSettings):
     enable_hitl: bool = Field(default=True, alias="ENABLE_HITL")
     enable_mcp: bool = Field(default=True, alias="ENABLE_MCP")
     enable_memory: bool = Field(default=True, alias="ENABLE_MEMORY")
+    enable_router_cache: bool = Field(default=False, alias="ENABLE_ROUTER_CACHE")
 
     # 会话清理
     session_cleanup_interval_minutes: int = Field(
@@ -21,10 +21,13 @@ engine = create_engine(
     pool_recycle=300,
     # 🔥 每次取连接前 ping 一下，确保连接活着 (虽然有一点点性能损耗，但极其稳定)
     pool_pre_ping=True,
+    # 后进先出：优先复用最近归还的热连接，低峰期多余的空闲连接自然老化并被 recycle 回收
+    pool_use_lifo=True,
 )
 logger.info("[Database] Using PostgreSQL: %s", settings.get_masked_database_url())
 logger.info(
-    "[Database] Connection pool: size=20, max_overflow=10, pool_recycle=300s, pool_pre_ping=True"
+    "[Database] Connection pool: size=20, max_overflow=10, pool_recycle=300s, "
+    "pool_pre_ping=True, pool_use_lifo=True"
 )
 
 
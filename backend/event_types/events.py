@@ -3,10 +3,12 @@ SSE 事件类型定义
 统一前后端事件协议
 """
 
+import json
 from datetime import datetime
 from enum import StrEnum
 from typing import Any
 
+import orjson  # C 扩展序列化，大体量 artifact / 专家输出明显快于标准库 json
 from pydantic import BaseModel, Field
 
 
@@ -271,11 +273,14 @@ def sse_event_to_string(event: SSEEvent) -> str:
         data: <json>
 
     """
-    import json
-
-    lines = [
-        f"id: {event.id}",
-        f"event: {event.type.value}",
-        f"data: {json.dumps(event.data, ensure_ascii=False)}",
-    ]
-    return "\n".join(lines) + "\n\n"
+    # 单个 f-string 一次拼出整帧，避免中间列表与二次拼接
+    return f"id: {event.id}\nevent: {event.type.value}\ndata: {dumps_event_data(event.data)}\n\n"
+
+
+def dumps_event_data(data: Any) -> str:
+    """序列化事件数据（及其他 JSON 载荷）：orjson 紧凑输出、原样保留中文，不支持的类型回退标准库"""
+    try:
+        return orjson.dumps(data).decode()
+    except TypeError:
+        # 非字符串键、超出 64 位的整数等 orjson 不支持的数据
+        return json.dumps(data, ensure_ascii=False)
@@ -41,7 +41,7 @@ from database import create_db_and_tables, engine
 from models import SkillTemplate, SystemExpert, User
 from routers import agents, chat, mcp, runs, stats, system
 from utils.exceptions import AppError, ValidationError, handle_error
-from utils.logger import logger
+from utils.logger import logger, start_queue_logging, stop_queue_logging
 
 # ============================================================================
 # Lifespan - 应用生命周期管理
@@ -83,6 +83,9 @@ def _init_library_templates_sync():
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    # 日志写入移交后台线程，避免同步 I/O 阻塞事件循环
+    # （仅在根记录器已有处理器时生效，即通过 run.py 启动；直接 uvicorn main:app 时为空操作）
+    start_queue_logging()
     # 初始化配置
     logger.info(f"启动环境: {settings.environment}")
     settings.init_langsmith()
@@ -124,16 +127,26 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         logger.warning(f"[Lifespan] 初始化管理员失败（非致命错误）: {e}")
 
-    # 清空专家缓存，确保使用最新的兜底机制重新加载
-    from agents.services.expert_manager import force_refresh_all
+    # 重建专家缓存：一次性预加载全部专家（应用最新的兜底机制），失败则退化为清空缓存
+    # 缓存 TTL 为 5 分钟，之后由后台任务定时重新预热
+    from agents.services.expert_manager import (
+        force_refresh_all,
+        preload_all_experts_from_db,
+        run_expert_cache_refresh_loop,
+    )
 
-    force_refresh_all()
-    logger.info("[Lifespan] Expert cache cleared for fresh start")
+    try:
+        expert_count = await asyncio.to_thread(preload_all_experts_from_db)
+        logger.info(f"[Lifespan] Expert cache preloaded: {expert_count} experts")
+    except Exception as e:
+        force_refresh_all()
+        logger.warning(f"[Lifespan] 专家缓存预热失败，已清空缓存（非致命错误）: {e}")
 
     logger.info("[Lifespan] Startup complete, yielding control to Uvicorn...")
     from services.session_cleanup_service import run_session_cleanup_loop
 
     cleanup_task = asyncio.create_task(run_session_cleanup_loop())
+    expert_refresh_task = asyncio.create_task(run_expert_cache_refresh_loop())
     yield
     logger.info("[Lifespan] Shutdown started...")
 
@@ -143,6 +156,21 @@ async def lifespan(app: FastAPI):
     except asyncio.CancelledError:
         logger.info("[Lifespan] Session cleanup task stopped")
 
+    expert_refresh_task.cancel()
+    try:
+        await expert_refresh_task
+    except asyncio.CancelledError:
+        logger.info("[Lifespan] Expert cache refresh task stopped")
+
+    # 🔥 冲刷后台保存队列中尚未写库的专家结果，然后停止常驻消费者
+    from utils.async_task_queue import shutdown_expert_result_saver, wait_for_pending_saves
+
+    try:
+        await asyncio.wait_for(wait_for_pending_saves(), timeout=10)
+    except TimeoutError:
+        logger.warning("[Lifespan WARN] Pending expert result saves not flushed in time")
+    await shutdown_expert_result_saver()
+
     # 🔥 关闭连接池
     from utils.db import close_connection_pool
 
@@ -152,6 +180,8 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         logger.warning(f"[Lifespan WARN] Failed to close connection pool: {e}")
 
+    stop_queue_logging()
+
 
 # ============================================================================
 # FastAPI 应用实例
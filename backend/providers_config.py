@@ -15,6 +15,7 @@ LLM 提供商配置管理模块
 
 import os
 import sys
+from dataclasses import dataclass
 from functools import lru_cache
 from pathlib import Path
 from typing import Any
@@ -315,15 +316,16 @@ def print_embedding_status():
 # ============================================================================
 
 
+@lru_cache(maxsize=128)
 def get_model_config(model_id: str) -> dict[str, Any] | None:
     """
-    获取指定模型的配置
+    获取指定模型的配置（带缓存，reload_config 时一并失效）
 
     Args:
         model_id: 模型标识（如 'minimax-2.1', 'gpt-4o'）
 
     Returns:
-        模型配置字典，如果不存在返回 None
+        模型配置字典，如果不存在返回 None；调用方只读，不要原地修改
         注意：会合并 provider 的默认配置（如 temperature）
     """
     config = load_providers_config()
@@ -345,6 +347,46 @@ def get_model_config(model_id: str) -> dict[str, Any] | None:
     return model_config
 
 
+@dataclass(frozen=True, slots=True)
+class ModelSpec:
+    """模型运行参数（由 providers.yaml 预先解析，热路径只读属性）"""
+
+    provider: str | None
+    api_model: str
+    # None 表示模型与 provider 均未配置温度，由调用方兜底
+    temperature: float | None
+    content_mode: str
+
+
+@lru_cache(maxsize=128)
+def get_model_spec(model_id: str) -> ModelSpec | None:
+    """
+    获取模型运行参数（带缓存，reload_config 时一并失效）
+
+    Args:
+        model_id: 模型标识（如 'minimax-2.1', 'gpt-4o'）
+
+    Returns:
+        ModelSpec，模型未配置时返回 None
+    """
+    model_config = get_model_config(model_id)
+    if not model_config:
+        return None
+
+    provider = model_config.get("provider")
+    content_mode = "string"  # 默认使用 string 模式（安全）
+    if provider:
+        provider_config = get_provider_config(provider) or {}
+        content_mode = provider_config.get("content_mode", "string")
+
+    return ModelSpec(
+        provider=provider,
+        api_model=model_config.get("model", model_id),
+        temperature=model_config.get("temperature"),
+        content_mode=content_mode,
+    )
+
+
 def get_models_by_provider(provider: str) -> list[dict[str, Any]]:
     """
     获取指定提供商的所有模型
@@ -499,6 +541,8 @@ def reload_config():
     """
     global load_providers_config
     load_providers_config.cache_clear()
+    get_model_config.cache_clear()
+    get_model_spec.cache_clear()
     logger.info("[INFO] 提供商配置已重新加载")
 
 
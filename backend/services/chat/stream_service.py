@@ -40,6 +40,7 @@ from crud.run_event import (
     emit_run_completed,
     emit_run_failed,
 )
+from event_types.events import dumps_event_data
 from models import AgentRun, CustomAgent, ExecutionPlan, RunStatus, Thread
 from providers_config import get_model_config, get_provider_api_key, get_provider_config
 from services.mcp_tools_service import mcp_tools_service
@@ -1311,8 +1312,6 @@ class StreamService:
 
     def transform_langgraph_event(self, token, message_id: str | None = None) -> str | None:
         """将 LangGraph 事件转换为 SSE 格式"""
-        import json
-
         # 🔥 修复：token 可能是字符串或其他类型，需要安全检查
         if not isinstance(token, dict):
             return None
@@ -1357,7 +1356,9 @@ class StreamService:
         if event_type == "on_chat_model_stream":
             data = token.get("data", {})
             chunk = data.get("chunk")
-            if chunk and hasattr(chunk, "content") and chunk.content:
+            # 每个 token 都会经过这里：content 只取一次，调试日志使用惰性格式化
+            content = getattr(chunk, "content", None)
+            if content:
                 # 🔥🔥🔥 P0热修：严格过滤 commander 和 expert 节点的 message.delta
                 # 这些节点的内容应通过专用事件发送（plan.thinking/artifact.chunk）
                 # 只有 aggregator 节点允许发送 message.delta
@@ -1368,14 +1369,17 @@ class StreamService:
                 # 拦截条件1：明确的节点类型为 commander 或 expert
                 if node_type in ["commander", "expert"]:
                     logger.debug(
-                        f"[transform_langgraph_event] 拦截 {node_type} 节点的 message.delta: {chunk.content[:50]}..."
+                        "[transform_langgraph_event] 拦截 %s 节点的 message.delta: %.50s...",
+                        node_type,
+                        content,
                     )
                     return None
 
                 # 拦截条件2：包含 streaming 和 generic_worker 标签（向后兼容）
                 if "streaming" in tags and "generic_worker" in tags:
                     logger.debug(
-                        f"[transform_langgraph_event] GenericWorker 流式专家内容跳过 message.delta: {chunk.content[:50]}..."
+                        "[transform_langgraph_event] GenericWorker 流式专家内容跳过 message.delta: %.50s...",
+                        content,
                     )
                     return None
 
@@ -1386,13 +1390,16 @@ class StreamService:
 
                 # 只发送纯净数据，包含 message_id 用于前端消息关联
                 # 注意：只有 aggregator 节点会执行到这里
-                event_data = {"content": chunk.content}
+                event_data = {"content": content}
                 if message_id:
                     event_data["message_id"] = message_id
                 logger.debug(
-                    f"[transform_langgraph_event] 允许 message.delta (node_type={node_type}, tags={tags}): {chunk.content[:50]}..."
+                    "[transform_langgraph_event] 允许 message.delta (node_type=%s, tags=%s): %.50s...",
+                    node_type,
+                    tags,
+                    content,
                 )
-                return f"event: message.delta\ndata: {json.dumps(event_data)}\n\n"
+                return f"event: message.delta\ndata: {dumps_event_data(event_data)}\n\n"
 
         # 处理 chain 事件
         if event_type == "on_chain_start":
@@ -1411,7 +1418,7 @@ class StreamService:
                         "description": task.get("description"),
                         "started_at": datetime.now().isoformat(),
                     }
-                    return f"event: task.started\ndata: {json.dumps(event_data)}\n\n"
+                    return f"event: task.started\ndata: {dumps_event_data(event_data)}\n\n"
 
         if event_type == "on_chain_end":
             name = token.get("name", "")
@@ -1432,7 +1439,7 @@ class StreamService:
                         "status": "completed",
                         "completed_at": datetime.now().isoformat(),
                     }
-                    return f"event: task.completed\ndata: {json.dumps(event_data)}\n\n"
+                    return f"event: task.completed\ndata: {dumps_event_data(event_data)}\n\n"
 
             # aggregator 完成：message.done 由 aggregator_node 通过 event_queue 发送
             # 这里不再重复发送
@@ -1,6 +1,8 @@
 import asyncio
+import threading
 from datetime import datetime
 
+from cachetools import TTLCache
 from sqlmodel import Session, select
 
 from database import engine
@@ -8,6 +10,12 @@ from models.memory import UserMemory
 from providers_config import get_embedding_client
 from utils.logger import logger
 
+# 查询向量缓存: (模型, 文本) -> embedding (10分钟TTL)
+# 同一轮对话中 router 与 direct_reply 会用同一条用户输入检索记忆，命中后省去一次嵌入 API 往返
+# 调用方运行在线程池中，TTLCache 本身非线程安全，读写需加锁
+_embedding_cache: TTLCache = TTLCache(maxsize=256, ttl=600)
+_embedding_cache_lock = threading.Lock()
+
 
 def get_embedding(text: str) -> list[float]:
     """
@@ -19,13 +27,38 @@ def get_embedding(text: str) -> list[float]:
         # 从统一配置获取客户端
         client, model, dimensions = get_embedding_client()
 
-        response = client.embeddings.create(input=text.replace("\n", " "), model=model)
-        return response.data[0].embedding
+        normalized_text = text.replace("\n", " ")
+        cache_key = (model, normalized_text)
+        with _embedding_cache_lock:
+            cached = _embedding_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        response = client.embeddings.create(input=normalized_text, model=model)
+        embedding = response.data[0].embedding
+        with _embedding_cache_lock:
+            _embedding_cache[cache_key] = embedding
+        return embedding
     except Exception as e:
         logger.error(f"[Memory] Embedding Error: {e}")
         return []
 
 
+def get_cached_embedding(text: str) -> list[float]:
+    """
+    只读查询向量缓存：不发起嵌入请求，也不记录错误
+
+    未命中或嵌入提供商未配置时返回空列表，供只想复用已有向量的调用方使用（如路由语义缓存）。
+    """
+    try:
+        _, model, _ = get_embedding_client()
+    except Exception:
+        return []
+
+    with _embedding_cache_lock:
+        return _embedding_cache.get((model, text.replace("\n", " "))) or []
+
+
 class MemoryManager:
     """记忆管理器 - 处理用户长期记忆的存储和检索"""
 
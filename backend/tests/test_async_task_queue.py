@@ -0,0 +1,78 @@
+import asyncio
+
+import utils.async_task_queue as async_task_queue
+
+
+async def test_enqueue_expert_result_save_batches_in_background(monkeypatch):
+    batches = []
+    monkeypatch.setattr(async_task_queue, "_sync_save_batch", lambda items: batches.append(items))
+
+    for index in range(3):
+        async_task_queue.enqueue_expert_result_save(
+            task_id=f"t{index}", expert_type="coder", output_result="ok"
+        )
+    await async_task_queue.wait_for_pending_saves()
+
+    saved = [item["task_id"] for batch in batches for item in batch]
+    assert saved == ["t0", "t1", "t2"]
+    assert len(batches) < 3
+
+
+async def test_enqueue_expert_result_save_falls_back_when_queue_full(monkeypatch):
+    saved = []
+
+    async def fake_async_save(**item):
+        saved.append(item["task_id"])
+
+    monkeypatch.setattr(async_task_queue, "_SAVE_QUEUE_MAXSIZE", 1)
+    monkeypatch.setattr(async_task_queue, "_sync_save_batch", lambda items: None)
+    monkeypatch.setattr(async_task_queue, "async_save_expert_result", fake_async_save)
+    monkeypatch.setattr(
+        async_task_queue, "_expert_result_saver", async_task_queue._ExpertResultSaver()
+    )
+
+    async_task_queue.enqueue_expert_result_save(task_id="t0", expert_type="coder", output_result="")
+    async_task_queue.enqueue_expert_result_save(task_id="t1", expert_type="coder", output_result="")
+    await async_task_queue.wait_for_pending_saves()
+    await asyncio.sleep(0)
+
+    assert saved == ["t1"]
+
+
+async def test_shutdown_cancels_idle_consumer(monkeypatch):
+    saver = async_task_queue._ExpertResultSaver()
+    monkeypatch.setattr(async_task_queue, "_expert_result_saver", saver)
+    monkeypatch.setattr(async_task_queue, "_sync_save_batch", lambda items: None)
+
+    async_task_queue.enqueue_expert_result_save(task_id="t0", expert_type="coder", output_result="")
+    await async_task_queue.wait_for_pending_saves()
+    consumer = saver._consumer
+
+    await async_task_queue.shutdown_expert_result_saver()
+
+    assert consumer.cancelled()
+    assert saver._consumer is None
+    await async_task_queue.shutdown_expert_result_saver()
+
+
+async def test_wait_for_pending_saves_awaits_overflow_tasks(monkeypatch):
+    saved = []
+
+    async def slow_async_save(**item):
+        await asyncio.sleep(0.05)
+        saved.append(item["task_id"])
+
+    monkeypatch.setattr(async_task_queue, "_SAVE_QUEUE_MAXSIZE", 1)
+    monkeypatch.setattr(async_task_queue, "_sync_save_batch", lambda items: None)
+    monkeypatch.setattr(async_task_queue, "async_save_expert_result", slow_async_save)
+    monkeypatch.setattr(
+        async_task_queue, "_expert_result_saver", async_task_queue._ExpertResultSaver()
+    )
+
+    for index in range(3):
+        async_task_queue.enqueue_expert_result_save(
+            task_id=f"t{index}", expert_type="coder", output_result=""
+        )
+    await async_task_queue.wait_for_pending_saves()
+
+    assert sorted(saved) == ["t1", "t2"]
@@ -0,0 +1,45 @@
+import asyncio
+import json
+
+from langchain_core.messages import AIMessageChunk
+
+from agents.nodes import commander
+
+
+class FakeStreamingLLM:
+    def __init__(self, chunks):
+        self.chunks = chunks
+
+    async def astream(self, messages, config=None):
+        for chunk in self.chunks:
+            yield AIMessageChunk(content=chunk)
+
+
+def _thinking_deltas(event_queue):
+    deltas = []
+    for entry in event_queue:
+        data_line = entry["event"].split("\n")[2]
+        deltas.append(json.loads(data_line.removeprefix("data: "))["delta"])
+    return deltas
+
+
+def test_streaming_fallback_coalesces_thinking_chunks():
+    plan = {
+        "strategy": "顺序执行",
+        "estimated_steps": 1,
+        "tasks": [{"id": "task_1", "expert_type": "writer", "description": "写作"}],
+    }
+    thinking_chunks = ["想" * 10] * 30
+    chunks = [*thinking_chunks, "收尾```json\n", json.dumps(plan, ensure_ascii=False), "```"]
+
+    result, event_queue = asyncio.run(
+        commander._streaming_planning_fallback(
+            FakeStreamingLLM(chunks), "system", "human", "plan-1", []
+        )
+    )
+
+    deltas = _thinking_deltas(event_queue)
+    assert result.tasks[0].expert_type == "writer"
+    assert "".join(deltas) == "".join(thinking_chunks) + "收尾"
+    assert len(deltas) == 2
+    assert len(deltas[0]) >= commander._THINKING_FLUSH_CHARS
@@ -54,6 +54,8 @@ def test_replace_task_item_returns_new_list_and_merges_fields():
     assert updated[0]["id"] == "t1"
     assert updated[0]["status"] == "completed"
     assert task_list[0]["status"] == "pending"
+    assert updated[0] is not task_list[0]
+    assert updated[1] is task_list[1]
 
 
 def test_append_sse_event_helpers_are_immutable():
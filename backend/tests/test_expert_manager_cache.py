@@ -0,0 +1,104 @@
+import contextlib
+
+from agents.services import expert_manager
+
+
+def test_preload_all_experts_replaces_global_cache(monkeypatch):
+    loaded = {
+        "coder": {"expert_key": "coder", "system_prompt": "写代码"},
+        "writer": {"expert_key": "writer", "system_prompt": "写文章"},
+    }
+    monkeypatch.setattr(expert_manager, "load_all_experts", lambda session: loaded)
+    expert_manager._expert_cache["stale"] = {"expert_key": "stale"}
+
+    try:
+        assert expert_manager.preload_all_experts(session=object()) == 2
+        assert expert_manager.get_expert_config_cached("coder") == loaded["coder"]
+        assert expert_manager.get_expert_prompt_cached("writer") == "写文章"
+        assert expert_manager.get_expert_config_cached("stale") is None
+    finally:
+        expert_manager._expert_cache.clear()
+
+
+def test_cached_lookups_treat_expired_entries_as_misses(monkeypatch):
+    from cachetools import TTLCache
+
+    now = [0.0]
+    cache = TTLCache(maxsize=4, ttl=10, timer=lambda: now[0])
+    cache["router"] = {"expert_key": "router", "system_prompt": "分类"}
+    monkeypatch.setattr(expert_manager, "_expert_cache", cache)
+
+    assert expert_manager.get_expert_prompt_cached("router") == "分类"
+    now[0] = 11.0
+    assert expert_manager.get_expert_config_cached("router") is None
+    assert expert_manager.get_expert_prompt_cached("router") is None
+
+
+def test_infer_provider_prefers_registry_then_prefix(monkeypatch):
+    registry = {"my-model": {"provider": "siliconflow"}}
+    monkeypatch.setattr(expert_manager, "get_model_config", registry.get)
+
+    assert expert_manager._infer_provider("my-model") == "siliconflow"
+    assert expert_manager._infer_provider("DeepSeek-Chat") == "deepseek"
+    assert expert_manager._infer_provider("kimi-k2") == "moonshot"
+    assert expert_manager._infer_provider("unknown-model") is None
+
+
+def test_load_all_experts_resolves_each_model_once(monkeypatch):
+    from models import SystemExpert
+
+    experts = [
+        SystemExpert(expert_key=key, name=key, system_prompt="p", model=model, temperature=0.5)
+        for key, model in (
+            ("coder", "deepseek-chat"),
+            ("writer", "deepseek-chat"),
+            ("search", None),
+        )
+    ]
+
+    class FakeSession:
+        def exec(self, statement):
+            return self
+
+        def all(self):
+            return experts
+
+    resolved = []
+
+    def fake_effective_model(model):
+        resolved.append(model)
+        return model or "minimax-m2"
+
+    monkeypatch.setattr(expert_manager, "get_effective_model", fake_effective_model)
+    monkeypatch.setattr(expert_manager, "get_model_config", lambda model: None)
+
+    configs = expert_manager.load_all_experts(FakeSession())
+
+    assert resolved == ["deepseek-chat", None]
+    assert configs["writer"]["model"] == "deepseek-chat"
+    assert configs["writer"]["provider"] == "deepseek"
+    assert configs["search"]["provider"] == "minimax"
+
+
+async def test_refresh_loop_repreloads_and_survives_failures(monkeypatch):
+    import asyncio
+
+    calls = []
+
+    def fake_preload():
+        calls.append(len(calls))
+        if len(calls) == 1:
+            raise RuntimeError("db down")
+        return 3
+
+    monkeypatch.setattr(expert_manager, "EXPERT_CACHE_REFRESH_SECONDS", 0)
+    monkeypatch.setattr(expert_manager, "preload_all_experts_from_db", fake_preload)
+
+    task = asyncio.create_task(expert_manager.run_expert_cache_refresh_loop())
+    while len(calls) < 2:
+        await asyncio.sleep(0.01)
+    task.cancel()
+    with contextlib.suppress(asyncio.CancelledError):
+        await task
+
+    assert len(calls) >= 2
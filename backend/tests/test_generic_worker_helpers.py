@@ -0,0 +1,135 @@
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+
+from agents.nodes import generic
+from agents.nodes.generic import (
+    _bind_model_cached,
+    _bind_tools_cached,
+    _detect_artifact_type,
+    _format_input_data,
+    _trim_history_for_llm,
+    normalize_message_content,
+    normalize_messages_for_llm,
+)
+
+
+def test_detect_artifact_type_html_document():
+    assert _detect_artifact_type("<!DOCTYPE html><html><body></body></html>", "coder") == "html"
+
+
+def test_detect_artifact_type_html_code_block():
+    content = "下面是页面：\n```HTML\n<div>hi</div>\n```"
+
+    assert _detect_artifact_type(content, "coder") == "html"
+
+
+def test_detect_artifact_type_markdown_and_text():
+    assert _detect_artifact_type("## 标题\n正文", "writer") == "markdown"
+    assert _detect_artifact_type("纯文本回复", "writer") == "text"
+
+
+def test_normalize_messages_for_llm_reuses_list_when_already_strings():
+    messages = [HumanMessage(content="hi"), ToolMessage(content="ok", tool_call_id="c1")]
+
+    assert normalize_messages_for_llm(messages, "string") is messages
+
+
+def test_normalize_messages_for_llm_stringifies_structured_tool_content():
+    messages = [ToolMessage(content=[{"text": "结果"}], tool_call_id="c1")]
+
+    normalized = normalize_messages_for_llm(messages, "string")
+
+    assert normalized is not messages
+    assert isinstance(normalized[0].content, str)
+    assert "结果" in normalized[0].content
+    assert normalized[0].tool_call_id == "c1"
+
+
+def test_normalize_message_content_serializes_non_string_keys():
+    assert normalize_message_content({1: "一"}) == '{"1": "一"}'
+    assert normalize_message_content("原样") == "原样"
+
+
+def test_bind_tools_cached_reuses_bound_runnable():
+    class FakeLLM:
+        def __init__(self):
+            self.bind_calls = 0
+
+        def bind_tools(self, tools):
+            self.bind_calls += 1
+            return ("bound", tuple(tools))
+
+    llm = FakeLLM()
+    tools = [object(), object()]
+
+    first = _bind_tools_cached(llm, llm, "model-a", 0.3, tools)
+    second = _bind_tools_cached(llm, llm, "model-a", 0.3, list(tools))
+    other_temp = _bind_tools_cached(llm, llm, "model-a", 0.7, tools)
+
+    assert first is second
+    assert other_temp is not first
+    assert llm.bind_calls == 2
+
+
+def test_format_input_data_lists_each_key():
+    assert _format_input_data({}) == "（无额外参数）"
+    assert _format_input_data({"city": "北京", "days": [1, 2]}) == "- city: 北京\n- days: [1, 2]"
+    assert _format_input_data({"b": {"y": 1, "x": "二"}, "a": 3}) == (
+        '- a: 3\n- b: {"x": "二", "y": 1}'
+    )
+
+
+def test_detect_artifact_type_matches_markers_case_insensitively_anywhere():
+    assert _detect_artifact_type("\n  <!DOCTYPE HTML><HTML></HTML>", "coder") == "html"
+    assert _detect_artifact_type("说明\n<HTML><body></body></HTML>", "coder") == "html"
+    assert _detect_artifact_type("前言\n\n- 要点", "writer") == "markdown"
+    assert _detect_artifact_type("代码：```py\nx = 1\n```", "coder") == "markdown"
+
+
+def test_bind_model_cached_reuses_binding_per_model_and_temperature():
+    class FakeLLM:
+        def __init__(self):
+            self.bind_calls = 0
+
+        def bind(self, **kwargs):
+            self.bind_calls += 1
+            return ("bound", tuple(sorted(kwargs.items())))
+
+    llm = FakeLLM()
+
+    first = _bind_model_cached(llm, "model-a", 0.0)
+    assert _bind_model_cached(llm, "model-a", 0.0) is first
+    assert _bind_model_cached(llm, "model-b", 0.0) is not first
+    assert llm.bind_calls == 2
+
+
+def test_detect_artifact_type_requires_closed_html_markers():
+    assert _detect_artifact_type("说明 <html>未闭合", "coder") == "text"
+    assert _detect_artifact_type("</html> 在前\n<html>", "coder") == "html"
+    assert _detect_artifact_type("```html\n<div>未闭合", "coder") == "markdown"
+    assert _detect_artifact_type("说明 <html>\n```html\n<p></p>\n```", "coder") == "html"
+
+
+def test_trim_history_for_llm_keeps_recent_turns_within_budget(monkeypatch):
+    monkeypatch.setattr(generic, "_HISTORY_TOKEN_BUDGET", 60)
+    tool_call = {"name": "search_web", "args": {"q": "x"}, "id": "c1"}
+    messages = [
+        HumanMessage(content="旧问题" * 40),
+        AIMessage(content="旧回答" * 40),
+        HumanMessage(content="新问题"),
+        AIMessage(content="", tool_calls=[tool_call]),
+        ToolMessage(content="结果", tool_call_id="c1"),
+    ]
+
+    assert _trim_history_for_llm(messages[2:]) == messages[2:]
+    assert _trim_history_for_llm(messages) == messages[2:]
+
+
+def test_trim_history_for_llm_keeps_current_turn_when_over_budget(monkeypatch):
+    monkeypatch.setattr(generic, "_HISTORY_TOKEN_BUDGET", 5)
+    messages = [
+        HumanMessage(content="旧问题"),
+        HumanMessage(content="新问题" * 40),
+        ToolMessage(content="结果" * 40, tool_call_id="c1"),
+    ]
+
+    assert _trim_history_for_llm(messages) == messages[1:]
@@ -0,0 +1,54 @@
+from types import SimpleNamespace
+
+from services import memory_manager
+
+
+class FakeEmbeddingsClient:
+    def __init__(self):
+        self.calls = []
+        self.embeddings = SimpleNamespace(create=self.create)
+
+    def create(self, input, model):
+        self.calls.append((input, model))
+        return SimpleNamespace(data=[SimpleNamespace(embedding=[float(len(self.calls))])])
+
+
+def test_get_embedding_reuses_vector_for_same_query(monkeypatch):
+    client = FakeEmbeddingsClient()
+    monkeypatch.setattr(memory_manager, "get_embedding_client", lambda: (client, "embed-model", 1))
+    memory_manager._embedding_cache.clear()
+
+    try:
+        first = memory_manager.get_embedding("今天\n吃什么")
+        second = memory_manager.get_embedding("今天\n吃什么")
+        other = memory_manager.get_embedding("明天吃什么")
+    finally:
+        memory_manager._embedding_cache.clear()
+
+    assert first == second == [1.0]
+    assert other == [2.0]
+    assert client.calls == [("今天 吃什么", "embed-model"), ("明天吃什么", "embed-model")]
+
+
+def test_get_cached_embedding_only_reads_cache(monkeypatch):
+    client = FakeEmbeddingsClient()
+    monkeypatch.setattr(memory_manager, "get_embedding_client", lambda: (client, "embed-model", 1))
+    memory_manager._embedding_cache.clear()
+
+    try:
+        assert memory_manager.get_cached_embedding("你好") == []
+        memory_manager.get_embedding("你好")
+        assert memory_manager.get_cached_embedding("你好") == [1.0]
+    finally:
+        memory_manager._embedding_cache.clear()
+
+    assert client.calls == [("你好", "embed-model")]
+
+
+def test_get_cached_embedding_is_silent_without_provider(monkeypatch):
+    def missing_provider():
+        raise ValueError("未设置嵌入模型 API Key")
+
+    monkeypatch.setattr(memory_manager, "get_embedding_client", missing_provider)
+
+    assert memory_manager.get_cached_embedding("你好") == []
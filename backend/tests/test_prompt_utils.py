@@ -0,0 +1,52 @@
+from datetime import datetime
+
+from utils import prompt_utils
+
+
+def test_enhance_system_prompt_is_cached_within_the_same_minute(monkeypatch):
+    class FakeDateTime(datetime):
+        current = datetime(2026, 2, 12, 14, 30, 5)
+
+        @classmethod
+        def now(cls, tz=None):
+            return cls.current
+
+    monkeypatch.setattr(prompt_utils, "datetime", FakeDateTime)
+
+    first = prompt_utils.enhance_system_prompt_with_tools("你是一个助手。")
+    FakeDateTime.current = datetime(2026, 2, 12, 14, 30, 59)
+    second = prompt_utils.enhance_system_prompt_with_tools("你是一个助手。")
+    FakeDateTime.current = datetime(2026, 2, 12, 14, 31, 0)
+    third = prompt_utils.enhance_system_prompt_with_tools("你是一个助手。")
+
+    assert first is second
+    assert first.startswith("你是一个助手。\n")
+    assert first.endswith(
+        "【当前系统时间】：2026年02月12日 14:30 星期四\n【当前日期】：2026-02-12\n"
+    )
+    assert "【工具使用强制指令 (Mandatory Tool Usage)】" in first
+    assert "14:31 星期四" in third
+    # 时间块之前的前缀逐字节一致，服务端前缀缓存可命中
+    assert third.split("【当前系统时间】")[0] == first.split("【当前系统时间】")[0]
+
+
+def test_inject_current_time_formats_weekday_and_date(monkeypatch):
+    class FakeDateTime(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return datetime(2026, 2, 15, 9, 5, 7)
+
+    monkeypatch.setattr(prompt_utils, "datetime", FakeDateTime)
+
+    prompt = prompt_utils.inject_current_time("你是一个助手。")
+
+    assert prompt.startswith(
+        "【当前系统时间】：2026年02月15日 09:05:07 星期日\n【当前日期】：2026-02-15\n"
+    )
+    assert '"2026-02-15 AI新闻"' in prompt
+
+
+def test_format_current_time_uses_chinese_weekday():
+    assert prompt_utils.format_current_time(datetime(2026, 2, 15, 9, 5, 7)) == (
+        "2026年02月15日 09:05:07 星期日"
+    )
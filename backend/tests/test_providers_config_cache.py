@@ -0,0 +1,32 @@
+import providers_config
+
+
+def test_get_model_config_is_cached_until_reload():
+    model_id = next(iter(providers_config.load_providers_config()["models"]))
+
+    first = providers_config.get_model_config(model_id)
+    assert providers_config.get_model_config(model_id) is first
+    assert "provider" in first
+
+    providers_config.reload_config()
+
+    assert providers_config.get_model_config.cache_info().currsize == 0
+    assert providers_config.get_model_config(model_id) == first
+
+
+def test_get_model_config_unknown_model_returns_none():
+    assert providers_config.get_model_config("__no_such_model__") is None
+
+
+def test_get_model_spec_resolves_provider_defaults_once():
+    model_id = next(iter(providers_config.load_providers_config()["models"]))
+    model_config = providers_config.get_model_config(model_id)
+
+    spec = providers_config.get_model_spec(model_id)
+
+    assert spec is providers_config.get_model_spec(model_id)
+    assert spec.provider == model_config["provider"]
+    assert spec.api_model == model_config.get("model", model_id)
+    assert spec.temperature == model_config.get("temperature")
+    assert spec.content_mode in {"string", "auto"}
+    assert providers_config.get_model_spec("__no_such_model__") is None
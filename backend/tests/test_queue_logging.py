@@ -0,0 +1,35 @@
+import logging
+
+from utils.logger import start_queue_logging, stop_queue_logging
+
+
+class _ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+def test_queue_logging_moves_root_handlers_to_listener_and_restores_them():
+    root = logging.getLogger()
+    original_handlers = list(root.handlers)
+    original_level = root.level
+    sink = _ListHandler()
+    root.addHandler(sink)
+    root.setLevel(logging.INFO)
+    try:
+        start_queue_logging()
+        assert sink not in root.handlers
+
+        logging.getLogger("queue_logging_test").info("后台写入")
+        stop_queue_logging()
+
+        assert [r.getMessage() for r in sink.records] == ["后台写入"]
+        assert sink in root.handlers
+    finally:
+        stop_queue_logging()
+        root.removeHandler(sink)
+        root.setLevel(original_level)
+    assert root.handlers == original_handlers
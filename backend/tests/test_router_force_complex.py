@@ -1,4 +1,11 @@
-from agents.nodes.router import _get_forced_complex_reason
+from langchain_core.messages import AIMessage, HumanMessage
+
+from agents.nodes import router
+from agents.nodes.router import (
+    _fill_router_placeholders,
+    _get_forced_complex_reason,
+    _router_cache_key,
+)
 
 
 def test_force_complex_for_travel_route_query():
@@ -19,3 +26,155 @@ def test_non_complex_smalltalk_not_forced():
     reason = _get_forced_complex_reason("你好，今天心情怎么样？")
 
     assert reason is None
+
+
+def test_router_cache_key_depends_on_prompt_memories_and_history():
+    messages = [HumanMessage(content="你好")]
+    key = _router_cache_key("prompt", "", messages)
+
+    assert key == _router_cache_key("prompt", "", [HumanMessage(content="你好")])
+    assert key != _router_cache_key("prompt", "喜欢咖啡", messages)
+    assert key != _router_cache_key("other prompt", "", messages)
+    assert key != _router_cache_key("prompt", "", [AIMessage(content="你好")])
+    assert key != _router_cache_key("prompt", "", [*messages, HumanMessage(content="写代码")])
+
+
+def test_semantic_router_cache_matches_similar_first_messages_per_user():
+    router._router_semantic_cache.clear()
+    try:
+        base = router._normalize_vector([1.0, 0.0, 0.0])
+        near = router._normalize_vector([0.99, 0.05, 0.0])
+        far = router._normalize_vector([0.0, 1.0, 0.0])
+
+        assert router._lookup_semantic_decision("u1", base) is None
+        router._remember_semantic_decision("u1", base, "simple")
+
+        assert router._lookup_semantic_decision("u1", near) == "simple"
+        assert router._lookup_semantic_decision("u1", far) is None
+        assert router._lookup_semantic_decision("u2", near) is None
+        assert router._normalize_vector([]) is None
+    finally:
+        router._router_semantic_cache.clear()
+
+
+def test_fill_router_placeholders_single_pass_keeps_user_braces():
+    prompt = "问题: {user_query}\n记忆: {relevant_memories}\n未知: {unknown}"
+
+    filled = _fill_router_placeholders(prompt, "解释 {relevant_memories}", "")
+
+    assert filled == "问题: 解释 {relevant_memories}\n记忆: （暂无记忆）\n未知: {unknown}"
+
+
+async def test_router_node_tolerates_memory_failure_while_loading_prompt(monkeypatch):
+    import agents.graph
+
+    captured = {}
+
+    class FakeStructuredLLM:
+        async def ainvoke(self, messages, config=None):
+            captured["system_prompt"] = messages[0].content
+            return {"decision_type": "simple"}
+
+    class FakeLLM:
+        def with_structured_output(self, schema):
+            return FakeStructuredLLM()
+
+    async def failing_search(user_id, query, limit=3):
+        raise RuntimeError("vector db down")
+
+    monkeypatch.setattr(router.memory_manager, "search_relevant_memories", failing_search)
+    monkeypatch.setattr(router, "_load_router_system_prompt", lambda: "记忆: {relevant_memories}")
+    monkeypatch.setattr(router.settings, "enable_router_cache", False)
+    monkeypatch.setattr(agents.graph, "get_router_llm_lazy", lambda: FakeLLM())
+
+    result = await router.router_node({"messages": [HumanMessage(content="你好")]})
+
+    assert result["router_decision"] == "simple"
+    assert captured["system_prompt"] == "记忆: （暂无记忆）"
+
+
+def test_parse_routing_decision_accepts_plain_and_fenced_json():
+    assert router._parse_routing_decision('{"decision_type": "simple"}').decision_type == "simple"
+    fenced = '```json\n{"decision_type": "complex"}\n```'
+    assert router._parse_routing_decision(fenced).decision_type == "complex"
+
+
+async def test_router_node_skips_structured_output_once_unsupported(monkeypatch):
+    import agents.graph
+
+    calls = {"structured": 0, "plain": 0, "wrapped": 0}
+
+    class FakeStructuredLLM:
+        async def ainvoke(self, messages, config=None):
+            calls["structured"] += 1
+            raise ValueError("Error code: 400 - response_format is not supported")
+
+    class FakeLLM:
+        def with_structured_output(self, schema):
+            calls["wrapped"] += 1
+            return FakeStructuredLLM()
+
+        async def ainvoke(self, messages, config=None):
+            calls["plain"] += 1
+            return AIMessage(content='{"decision_type": "simple"}')
+
+    async def no_memories(user_id, query, limit=3):
+        return ""
+
+    llm = FakeLLM()
+    monkeypatch.setattr(router.memory_manager, "search_relevant_memories", no_memories)
+    monkeypatch.setattr(router, "_load_router_system_prompt", lambda: "分类")
+    monkeypatch.setattr(router.settings, "enable_router_cache", False)
+    monkeypatch.setattr(agents.graph, "get_router_llm_lazy", lambda: llm)
+    monkeypatch.setattr(router, "_structured_router_cache", {})
+
+    for _ in range(2):
+        result = await router.router_node({"messages": [HumanMessage(content="你好")]})
+        assert result["router_decision"] == "simple"
+
+    assert calls == {"structured": 1, "plain": 2, "wrapped": 1}
+
+
+def test_trim_router_history_keeps_recent_turns_within_budget(monkeypatch):
+    monkeypatch.setattr(router, "_ROUTER_HISTORY_TOKEN_BUDGET", 30)
+    messages = [
+        HumanMessage(content="旧问题" * 40),
+        AIMessage(content="旧回答" * 40),
+        HumanMessage(content="新问题"),
+    ]
+
+    assert router._trim_router_history(messages[2:]) == messages[2:]
+    assert router._trim_router_history(messages) == messages[2:]
+
+    monkeypatch.setattr(router, "_ROUTER_HISTORY_TOKEN_BUDGET", 1)
+    assert router._trim_router_history(messages) == messages[2:]
+
+
+async def test_collect_router_memories_skips_unused_retrieval():
+    import asyncio
+
+    started = asyncio.Event()
+
+    async def slow_search():
+        started.set()
+        await asyncio.sleep(10)
+        return "喜欢咖啡"
+
+    pending = asyncio.ensure_future(slow_search())
+    await started.wait()
+    assert await router._collect_router_memories(pending, needed=False) == ""
+    await asyncio.sleep(0)
+    assert pending.cancelled()
+
+    async def failing_search():
+        raise RuntimeError("vector db down")
+
+    failed = asyncio.ensure_future(failing_search())
+    await asyncio.sleep(0)
+    assert await router._collect_router_memories(failed, needed=False) == ""
+
+    async def fast_search():
+        return "喜欢咖啡"
+
+    used = asyncio.ensure_future(fast_search())
+    assert await router._collect_router_memories(used, needed=True) == "喜欢咖啡"
@@ -1,3 +1,4 @@
+import json
 import re
 import sys
 from pathlib import Path
@@ -9,7 +10,7 @@ FRONTEND_ROOT = REPO_ROOT / "frontend"
 if str(BACKEND_ROOT) not in sys.path:
     sys.path.insert(0, str(BACKEND_ROOT))
 
-from event_types.events import EventType  # noqa: E402
+from event_types.events import EventType, SSEEvent, sse_event_to_string  # noqa: E402
 
 
 def _extract_frontend_event_types() -> set[str]:
@@ -39,3 +40,66 @@ def test_event_handler_switch_covers_all_event_types():
     frontend_event_types = _extract_frontend_event_types()
     handled_event_types = _extract_frontend_handled_event_types()
     assert handled_event_types == frontend_event_types
+
+
+def test_sse_event_to_string_frame_format():
+    event = SSEEvent(
+        id="evt-1",
+        timestamp="2026-01-01T00:00:00",
+        type=EventType.TASK_COMPLETED,
+        data={"task_id": "t1", "output": "完成"},
+    )
+
+    frame = sse_event_to_string(event)
+
+    assert frame.startswith("id: evt-1\nevent: task.completed\ndata: ")
+    assert frame.endswith("\n\n")
+    data_line = frame.split("\n")[2]
+    assert "完成" in data_line
+    assert json.loads(data_line.removeprefix("data: ")) == event.data
+
+
+def test_sse_event_to_string_falls_back_for_non_string_keys():
+    event = SSEEvent(
+        id="evt-2",
+        timestamp="2026-01-01T00:00:00",
+        type=EventType.TASK_PROGRESS,
+        data={"steps": {1: "一"}},
+    )
+
+    data_line = sse_event_to_string(event).split("\n")[2]
+
+    assert json.loads(data_line.removeprefix("data: ")) == {"steps": {"1": "一"}}
+
+
+def test_task_completed_event_truncates_output_preview():
+    from utils.event_generator import event_task_completed
+
+    long_event = event_task_completed(
+        task_id="t1",
+        expert_type="writer",
+        description="写作",
+        output="字" * 501,
+        duration_ms=10,
+        max_output_len=500,
+    )
+    short_event = event_task_completed(
+        task_id="t1",
+        expert_type="writer",
+        description="写作",
+        output="字" * 500,
+        duration_ms=10,
+        max_output_len=500,
+    )
+
+    assert long_event.data["output"] == "字" * 500 + "..."
+    assert short_event.data["output"] == "字" * 500
+
+
+def test_heartbeat_event_uses_shared_serializer():
+    from utils.sse_builder import build_heartbeat_event
+
+    frame = build_heartbeat_event()
+
+    assert frame.startswith("event: heartbeat\ndata: ")
+    assert "ts" in json.loads(frame.split("\n")[1].removeprefix("data: "))
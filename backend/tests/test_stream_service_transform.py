@@ -0,0 +1,30 @@
+import json
+
+from langchain_core.messages import AIMessageChunk
+
+from services.chat.stream_service import StreamService
+
+
+def _stream_token(content: str, node_type: str) -> dict:
+    return {
+        "event": "on_chat_model_stream",
+        "data": {"chunk": AIMessageChunk(content=content)},
+        "metadata": {"tags": [], "node_type": node_type},
+    }
+
+
+def test_transform_emits_message_delta_for_aggregator_chunks():
+    service = StreamService(db_session=None)
+
+    frame = service.transform_langgraph_event(_stream_token("你好", "aggregator"), "msg-1")
+
+    assert frame.startswith("event: message.delta\ndata: ")
+    payload = json.loads(frame.split("\n")[1].removeprefix("data: "))
+    assert payload == {"content": "你好", "message_id": "msg-1"}
+
+
+def test_transform_drops_expert_and_empty_chunks():
+    service = StreamService(db_session=None)
+
+    assert service.transform_langgraph_event(_stream_token("内部", "expert")) is None
+    assert service.transform_langgraph_event(_stream_token("", "aggregator")) is None
@@ -86,3 +86,23 @@ def test_dynamic_tool_node_blocks_builtin_tool_for_memorize_expert(monkeypatch):
     message = result["messages"][0]
     assert isinstance(message, ToolMessage)
     assert "策略拒绝" in message.content
+
+
+def test_get_tool_executor_reuses_tool_node_for_same_tool_set(monkeypatch):
+    built = []
+
+    class _RecordingToolNode:
+        def __init__(self, tools):
+            built.append(tuple(tools))
+
+    monkeypatch.setattr(tool_runtime, "ToolNode", _RecordingToolNode)
+    monkeypatch.setattr(tool_runtime, "_tool_executor_cache", tool_runtime.TTLCache(8, 60))
+    tools = [_DummyTool("search_web"), _DummyTool("read_webpage")]
+
+    first = tool_runtime._get_tool_executor(tools)
+    second = tool_runtime._get_tool_executor(list(tools))
+    other = tool_runtime._get_tool_executor(tools[:1])
+
+    assert first is second
+    assert other is not first
+    assert len(built) == 2
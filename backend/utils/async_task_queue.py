@@ -17,11 +17,18 @@ Updated: 2026-03-02 - P0 修复: 单例模式改用 lru_cache，避免 asyncio.L
 """
 
 import asyncio
+import contextlib
 import functools
 from collections.abc import Callable
 from concurrent.futures import ThreadPoolExecutor
 from typing import Any
 
+from utils.logger import logger
+
+# 专家结果保存队列：单个常驻消费者批量取出，复用同一个 Session
+_SAVE_QUEUE_MAXSIZE = 256
+_SAVE_BATCH_SIZE = 16
+
 
 class AsyncTaskQueue:
     """
@@ -156,6 +163,27 @@ def _sync_save_wrapper(
             # 可以在这里加 Sentry 监控
 
 
+def _sync_save_batch(items: list[dict[str, Any]]) -> None:
+    """
+    同步批量保存专家执行结果（在后台线程中执行）
+
+    一批请求共用一个 Session；单条失败只回滚该条，不影响同批其他结果。
+
+    Args:
+        items: 保存请求列表，每项为 _sync_save_wrapper 的关键字参数
+    """
+    from agents.services.task_manager import save_expert_execution_result
+    from database import Session, engine
+
+    with Session(engine) as new_session:
+        for item in items:
+            try:
+                save_expert_execution_result(new_session, **item)
+            except Exception as e:
+                new_session.rollback()
+                logger.warning(f"[AsyncTaskQueue] 专家结果保存失败: {item.get('task_id')} | {e}")
+
+
 def _sync_append_run_event_wrapper(
     *,
     run_id: str,
@@ -215,6 +243,113 @@ async def async_save_expert_result(
     )
 
 
+class _ExpertResultSaver:
+    """
+    专家结果保存队列（生产者/消费者）
+
+    替代每个任务一次的 asyncio.create_task：生产者 put_nowait 入队，
+    常驻消费者一次最多取出 _SAVE_BATCH_SIZE 条，交给线程池批量写入。
+    队列与消费者延迟创建并绑定到当前事件循环，循环变化时重建。
+    """
+
+    def __init__(self) -> None:
+        self._queue: asyncio.Queue | None = None
+        self._consumer: asyncio.Task | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        # 队列满时的兜底任务，保留强引用避免被 GC 回收
+        self._overflow_tasks: set[asyncio.Task] = set()
+
+    def _ensure_consumer(self) -> asyncio.Queue:
+        loop = asyncio.get_running_loop()
+        if self._queue is None or self._loop is not loop:
+            self._queue = asyncio.Queue(maxsize=_SAVE_QUEUE_MAXSIZE)
+            self._loop = loop
+            self._consumer = None
+        if self._consumer is None or self._consumer.done():
+            self._consumer = loop.create_task(self._consume(self._queue))
+        return self._queue
+
+    async def _consume(self, queue: asyncio.Queue) -> None:
+        while True:
+            batch = [await queue.get()]
+            while len(batch) < _SAVE_BATCH_SIZE and not queue.empty():
+                batch.append(queue.get_nowait())
+            try:
+                await asyncio.to_thread(_sync_save_batch, batch)
+            except Exception as e:
+                logger.warning(f"[AsyncTaskQueue] 批量保存失败: {len(batch)} 条 | {e}")
+            finally:
+                for _ in batch:
+                    queue.task_done()
+
+    def submit(self, item: dict[str, Any]) -> None:
+        queue = self._ensure_consumer()
+        try:
+            queue.put_nowait(item)
+        except asyncio.QueueFull:
+            logger.warning("[AsyncTaskQueue] 保存队列已满，回退为独立后台任务")
+            task = asyncio.create_task(async_save_expert_result(**item))
+            self._overflow_tasks.add(task)
+            task.add_done_callback(self._overflow_tasks.discard)
+
+    async def join(self) -> None:
+        """等待已入队的保存请求及队列满时回退的独立保存任务全部处理完毕"""
+        if self._queue is not None and self._loop is asyncio.get_running_loop():
+            await self._queue.join()
+        if self._overflow_tasks:
+            await asyncio.gather(*self._overflow_tasks, return_exceptions=True)
+
+    async def shutdown(self) -> None:
+        """取消并回收常驻消费者（关闭前调用，避免事件循环关闭时遗留 pending 任务）"""
+        consumer, loop = self._consumer, self._loop
+        self._queue = None
+        self._consumer = None
+        self._loop = None
+        # 绑定在其他（已关闭的）事件循环上的消费者无法在此回收，直接丢弃引用
+        if consumer is None or consumer.done() or loop is not asyncio.get_running_loop():
+            return
+
+        consumer.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await consumer
+
+
+_expert_result_saver = _ExpertResultSaver()
+
+
+def enqueue_expert_result_save(
+    task_id: str,
+    expert_type: str,
+    output_result: str,
+    artifact_data: dict[str, Any] | None = None,
+    duration_ms: int | None = None,
+) -> None:
+    """
+    将专家执行结果放入后台保存队列（不阻塞、不等待）
+
+    必须在运行中的事件循环内调用；队列满时回退为 async_save_expert_result 独立任务。
+    """
+    _expert_result_saver.submit(
+        {
+            "task_id": task_id,
+            "expert_type": expert_type,
+            "output_result": output_result,
+            "artifact_data": artifact_data,
+            "duration_ms": duration_ms,
+        }
+    )
+
+
+async def wait_for_pending_saves() -> None:
+    """等待保存队列清空（用于关闭前冲刷及测试）"""
+    await _expert_result_saver.join()
+
+
+async def shutdown_expert_result_saver() -> None:
+    """停止后台保存消费者（应在 wait_for_pending_saves 之后调用）"""
+    await _expert_result_saver.shutdown()
+
+
 async def async_append_run_event(
     *,
     run_id: str,
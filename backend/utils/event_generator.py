@@ -146,8 +146,15 @@ class EventGenerator:
         output: str | None,
         duration_ms: int,
         artifact_count: int = 0,
+        max_output_len: int | None = None,
     ) -> SSEEvent:
-        """生成 task.completed 事件"""
+        """
+        生成 task.completed 事件
+
+        max_output_len: 输出预览的最大长度，超出部分截断并追加 "..."；None 表示不截断
+        """
+        if output and max_output_len is not None and len(output) > max_output_len:
+            output = f"{output[:max_output_len]}..."
         data = TaskCompletedData(
             task_id=task_id,
             expert_type=expert_type,
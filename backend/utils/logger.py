@@ -1,14 +1,19 @@
 """
 日志工具模块
 
-提供统一的日志记录器获取方式
+提供统一的日志记录器获取方式，以及可选的队列化输出（QueueHandler + QueueListener）
 """
 
 import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
 
 # 默认日志格式
 DEFAULT_FORMAT = "%(levelname)s: %(message)s"
 
+# 队列化输出状态：(监听器, 队列处理器, 被接管的原始处理器)
+_queue_logging: tuple[QueueListener, QueueHandler, list[logging.Handler]] | None = None
+
 
 def get_logger(name: str) -> logging.Logger:
     """
@@ -23,5 +28,49 @@ def get_logger(name: str) -> logging.Logger:
     return logging.getLogger(name)
 
 
+def start_queue_logging() -> None:
+    """
+    将根记录器处理器的 I/O 移交给后台线程
+
+    事件循环里的 logger 调用只把 LogRecord 放入内存队列，
+    stream/file 写入由 QueueListener 线程完成，不再阻塞协程。
+    注意：QueueHandler.prepare() 仍在调用方线程中格式化消息，移出事件循环的只有 I/O。
+
+    仅接管调用时根记录器上已有的处理器：通过 run.py 启动时由 logging.basicConfig 配置；
+    直接 `uvicorn main:app` 启动时根记录器没有处理器（uvicorn 只配置自己的记录器），
+    此时为空操作，日志行为保持不变。已启用时同样为空操作。
+    """
+    global _queue_logging
+    root = logging.getLogger()
+    if _queue_logging is not None or not root.handlers:
+        return
+
+    handlers = list(root.handlers)
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    queue_handler = QueueHandler(log_queue)
+
+    for handler in handlers:
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    listener.start()
+    _queue_logging = (listener, queue_handler, handlers)
+
+
+def stop_queue_logging() -> None:
+    """停止后台日志线程（先冲刷队列），并恢复根记录器的原始处理器"""
+    global _queue_logging
+    if _queue_logging is None:
+        return
+
+    listener, queue_handler, handlers = _queue_logging
+    _queue_logging = None
+    root = logging.getLogger()
+    root.removeHandler(queue_handler)
+    listener.stop()
+    for handler in handlers:
+        root.addHandler(handler)
+
+
 # 兼容旧代码的导出方式
 logger = get_logger(__name__)
@@ -7,6 +7,35 @@ Prompt 工具函数
 """
 
 from datetime import datetime
+from functools import lru_cache
+
+_WEEKDAYS = ("星期一", "星期二", "星期三", "星期四", "星期五", "星期六", "星期日")
+
+# 🔥 核心增强：给模型洗脑，强制它使用工具，禁止脑补
+# 静态工具指令（与专家、时间均无关），模块级常量保证跨请求逐字节一致
+_TOOLS_INSTRUCTIONS = """【工具使用强制指令 (Mandatory Tool Usage)】：
+你拥有强大的外部工具，针对以下情况 **必须** 调用工具，**严禁** 仅凭训练数据回答：
+1. **涉及具体 URL**：如果任务包含 http/https 链接（如 GitHub, 技术博客），**必须** 调用 `read_webpage` 读取全文。
+2. **涉及参数对比/最新技术**：如果任务要求"研究 DeepSeek-V3"、"参数对比"，**必须** 调用 `search_web` 或 `read_webpage` 获取一手数据。
+
+【防偷懒协议 (Anti-Laziness Protocol)】：
+1. **禁止复用上下文**：即使你觉得之前的对话里好像提到过相关信息，针对当前的具体任务（特别是 GitHub 阅读任务），你依然**必须**重新执行工具调用。
+2. **看到 URL 就去读**：不要盯着 URL 发呆，不要猜测 URL 里的内容。直接调用 `read_webpage`！
+3. **一步一动**：不要试图在一个回合里把所有事做完。先调工具 -> 拿到结果 -> 再分析。
+
+【执行逻辑】：
+检测到任务需求 -> 决定工具 (Search 或 Read) -> **输出 Tool Call** -> (等待执行) -> 获取 Artifact -> 生成回答。
+
+【容错处理指令 (Fault Tolerance)】：
+如果参考上下文中提到某些上游任务（如代码生成、数据分析等）的输出，但这些内容缺失或为空，
+请不要抱怨或询问，而是基于你已有的知识和当前可用信息，尽最大努力完成任务。
+忽略对缺失内容的引用，专注于完成核心任务目标。
+"""
+
+
+def format_current_time(now: datetime) -> str:
+    """格式化为中文时间字符串，如 2026年02月12日 14:30:00 星期四"""
+    return now.strftime(f"%Y年%m月%d日 %H:%M:%S {_WEEKDAYS[now.weekday()]}")
 
 
 def inject_current_time(system_prompt: str) -> str:
@@ -34,12 +63,10 @@ def inject_current_time(system_prompt: str) -> str:
         ...
     """
     now = datetime.now()
-    weekdays = ["星期一", "星期二", "星期三", "星期四", "星期五", "星期六", "星期日"]
-    weekday_str = weekdays[now.weekday()]
 
     # 格式化时间：2026年02月06日 14:30:00 星期五
-    time_str = now.strftime(f"%Y年%m月%d日 %H:%M:%S {weekday_str}")
-    date_str = now.strftime("%Y-%m-%d")
+    time_str = format_current_time(now)
+    date_str = now.date().isoformat()
 
     # 构建增强的 System Prompt
     enhanced_prompt = f"""【当前系统时间】：{time_str}
@@ -63,35 +90,24 @@ def enhance_system_prompt_with_tools(system_prompt: str) -> str:
     功能: 注入时间 + 强制工具使用指令 + 防偷懒逻辑
 
     用于 Generic Worker 节点，强制模型使用工具而非脑补答案。
+    时间精确到分钟，整段结果按 (system_prompt, 当前分钟) 缓存。
+    时间块放在末尾：同一专家的 system prompt 前缀跨调用保持不变，
+    便于 OpenAI / DeepSeek 等服务端自动前缀缓存命中。
     """
-    now = datetime.now()
-    weekdays = ["星期一", "星期二", "星期三", "星期四", "星期五", "星期六", "星期日"]
-    weekday_str = weekdays[now.weekday()]
-    time_str = now.strftime(f"%Y年%m月%d日 %H:%M:%S {weekday_str}")
-    date_str = now.strftime("%Y-%m-%d")
+    minute = datetime.now().replace(second=0, microsecond=0)
+    return _build_enhanced_prompt(system_prompt, minute)
 
-    # 🔥 核心增强：给模型洗脑，强制它使用工具，禁止脑补
-    enhanced_prompt = f"""【当前系统时间】：{time_str}
-【当前日期】：{date_str}
 
-{system_prompt}
+@lru_cache(maxsize=512)
+def _build_enhanced_prompt(system_prompt: str, minute: datetime) -> str:
+    """拼接工具指令正文与分钟级时间块（同一分钟内同一专家直接命中缓存）"""
+    weekday_str = _WEEKDAYS[minute.weekday()]
+    time_str = minute.strftime(f"%Y年%m月%d日 %H:%M {weekday_str}")
+    date_str = minute.date().isoformat()
 
-【工具使用强制指令 (Mandatory Tool Usage)】：
-你拥有强大的外部工具，针对以下情况 **必须** 调用工具，**严禁** 仅凭训练数据回答：
-1. **涉及具体 URL**：如果任务包含 http/https 链接（如 GitHub, 技术博客），**必须** 调用 `read_webpage` 读取全文。
-2. **涉及参数对比/最新技术**：如果任务要求"研究 DeepSeek-V3"、"参数对比"，**必须** 调用 `search_web` 或 `read_webpage` 获取一手数据。
+    return f"""{system_prompt}
 
-【防偷懒协议 (Anti-Laziness Protocol)】：
-1. **禁止复用上下文**：即使你觉得之前的对话里好像提到过相关信息，针对当前的具体任务（特别是 GitHub 阅读任务），你依然**必须**重新执行工具调用。
-2. **看到 URL 就去读**：不要盯着 URL 发呆，不要猜测 URL 里的内容。直接调用 `read_webpage`！
-3. **一步一动**：不要试图在一个回合里把所有事做完。先调工具 -> 拿到结果 -> 再分析。
-
-【执行逻辑】：
-检测到任务需求 -> 决定工具 (Search 或 Read) -> **输出 Tool Call** -> (等待执行) -> 获取 Artifact -> 生成回答。
-
-【容错处理指令 (Fault Tolerance)】：
-如果参考上下文中提到某些上游任务（如代码生成、数据分析等）的输出，但这些内容缺失或为空，
-请不要抱怨或询问，而是基于你已有的知识和当前可用信息，尽最大努力完成任务。
-忽略对缺失内容的引用，专注于完成核心任务目标。
+{_TOOLS_INSTRUCTIONS}
+【当前系统时间】：{time_str}
+【当前日期】：{date_str}
 """
-    return enhanced_prompt
@@ -8,7 +8,6 @@ SSE 事件构建工具。
 
 from __future__ import annotations
 
-import json
 import uuid
 from datetime import datetime
 
@@ -19,6 +18,7 @@ from event_types.events import (
     MessageDeltaData,
     MessageDoneData,
     build_sse_event,
+    dumps_event_data,
 )
 from utils.error_codes import ErrorCode, as_error_code
 from utils.event_generator import sse_event_to_string
@@ -73,4 +73,4 @@ def build_human_interrupt_event(
 
 
 def build_heartbeat_event() -> str:
-    return f"event: heartbeat\ndata: {json.dumps({'ts': datetime.now().isoformat()})}\n\n"
+    return f"event: heartbeat\ndata: {dumps_event_data({'ts': datetime.now().isoformat()})}\n\n"